@@ -1,6 +1,20 @@
 import heapq
+import json
+import os
+import tempfile
+from array import array
 from collections import defaultdict
+from contextlib import contextmanager
 import math
+import random
+import sys
+import time
+from multiprocessing import Pool, shared_memory
+
+
+# Set in each distance_matrix worker by _attach_arrays:
+# (shared block, indptr, indices, weights, target ids)
+_worker_graph = None
 
 
 def dijkstra(graph, start):
@@ -54,6 +68,832 @@ def get_path(predecessors, end):
     return path[::-1]  # Reverse to get path from start to end
 
 
+def shortest_path(graph, source, target, stats=None):
+    """Return (distance, path) from source to target, or (math.inf, []) if unreachable.
+
+    Unlike dijkstra, this stops as soon as target is settled and only keeps
+    state for the nodes it actually reaches. If a stats dict is given, the
+    number of settled nodes is stored in stats["settled"].
+    """
+    if source not in graph or target not in graph:
+        raise ValueError("Source and target must be nodes of the graph")
+
+    # Only touched nodes get an entry
+    distances = {source: 0}
+    predecessors = {source: None}
+    visited = set()
+    pq = [(0, source)]
+
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+        if current_node in visited:
+            continue
+        visited.add(current_node)
+
+        # The first time target is popped its distance is final
+        if current_node == target:
+            if stats is not None:
+                stats["settled"] = len(visited)
+            return current_distance, get_path(predecessors, target)
+
+        for neighbor, weight in graph[current_node].items():
+            if neighbor in visited:
+                continue
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, math.inf):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(pq, (distance, neighbor))
+
+    if stats is not None:
+        stats["settled"] = len(visited)
+    return math.inf, []
+
+
+def reverse_graph(graph):
+    """Return the graph with every edge reversed, for backward searches."""
+    reverse = {node: {} for node in graph}
+    for node, neighbors in graph.items():
+        for neighbor, weight in neighbors.items():
+            reverse.setdefault(neighbor, {})[node] = weight
+    return reverse
+
+
+def bidirectional_shortest_path(graph, source, target, reverse=None, stats=None):
+    """Return (distance, path) like shortest_path, searching from both ends at once.
+
+    A forward search from source and a backward search from target (over
+    reverse, which is built with reverse_graph if not given) take turns
+    settling one node each. best is the shortest source -> target path seen
+    where the two searches meet; once the two queue minimums add up to at
+    least best, no shorter path can exist.
+    """
+    if source not in graph or target not in graph:
+        raise ValueError("Source and target must be nodes of the graph")
+    if source == target:
+        if stats is not None:
+            stats["settled"] = 1
+        return 0, [source]
+    if reverse is None:
+        reverse = reverse_graph(graph)
+
+    # Index 0 is the forward search, index 1 the backward one
+    adjacency = (graph, reverse)
+    distances = ({source: 0}, {target: 0})
+    predecessors = ({source: None}, {target: None})
+    visited = (set(), set())
+    queues = ([(0, source)], [(0, target)])
+    best = math.inf
+    meeting = None  # Edge (u, v) where the best path crosses from one search to the other
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # Expand the side with the smaller queue (cheaper to grow)
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        other = 1 - side
+        current_distance, current_node = heapq.heappop(queues[side])
+        if current_node in visited[side]:
+            continue
+        visited[side].add(current_node)
+
+        for neighbor, weight in adjacency[side][current_node].items():
+            distance = current_distance + weight
+            if distance < distances[side].get(neighbor, math.inf):
+                distances[side][neighbor] = distance
+                predecessors[side][neighbor] = current_node
+                heapq.heappush(queues[side], (distance, neighbor))
+            # A path through this edge joins the two searches
+            if neighbor in distances[other]:
+                total = distance + distances[other][neighbor]
+                if total < best:
+                    best = total
+                    meeting = (current_node, neighbor) if side == 0 else (neighbor, current_node)
+
+    if stats is not None:
+        stats["settled"] = len(visited[0]) + len(visited[1])
+    if meeting is None:
+        return math.inf, []
+    # source -> u from the forward search, then v -> target from the backward one
+    u, v = meeting
+    return best, get_path(predecessors[0], u) + get_path(predecessors[1], v)[::-1]
+
+
+def astar(graph, source, target, heuristic, stats=None):
+    """Return (distance, path) from source to target, guided by heuristic(node).
+
+    heuristic(node) must never overestimate the distance from node to
+    target (admissible). Nodes are taken in order of distance + heuristic,
+    so the search heads towards target instead of growing in a circle. A
+    node is expanded again if a shorter path to it turns up later, which
+    keeps the result exact for admissible heuristics that are not
+    consistent. stats["settled"] counts expansions.
+    """
+    if source not in graph or target not in graph:
+        raise ValueError("Source and target must be nodes of the graph")
+
+    distances = {source: 0}
+    predecessors = {source: None}
+    pq = [(heuristic(source), 0, source)]  # (estimate, distance, node)
+    expanded = 0
+
+    while pq:
+        _, current_distance, current_node = heapq.heappop(pq)
+        # Skip entries superseded by a shorter path
+        if current_distance > distances[current_node]:
+            continue
+        expanded += 1
+        if current_node == target:
+            if stats is not None:
+                stats["settled"] = expanded
+            return current_distance, get_path(predecessors, target)
+
+        for neighbor, weight in graph[current_node].items():
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, math.inf):
+                estimate = heuristic(neighbor)
+                if estimate == math.inf:
+                    continue  # target cannot be reached from neighbor
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(pq, (distance + estimate, distance, neighbor))
+
+    if stats is not None:
+        stats["settled"] = expanded
+    return math.inf, []
+
+
+class Landmarks:
+    """Distance tables to and from a few landmark nodes, for ALT (A*, landmarks, triangle inequality).
+
+    For a landmark L, d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) -
+    d(t, L), so the largest of these over all landmarks is an admissible
+    heuristic for astar. Landmarks are picked far apart (each one the
+    node farthest from those already chosen), which gives the tightest
+    bounds. Each table is an array('d') indexed like list(graph).
+    """
+
+    def __init__(self, graph, count=8, reverse=None, seed=0):
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        if reverse is None:
+            reverse = reverse_graph(graph)
+        nodes = list(graph)
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.landmarks = []
+        self.from_landmark = []  # d(L, v) for every v
+        self.to_landmark = []  # d(v, L) for every v
+
+        # Smallest forward distance from any chosen landmark, per node
+        nearest = array("d", [math.inf]) * len(nodes)
+        landmark = random.Random(seed).choice(nodes)
+        for _ in range(min(count, len(nodes))):
+            self.landmarks.append(landmark)
+            forward, _ = dijkstra(graph, landmark)
+            backward, _ = dijkstra(reverse, landmark)
+            self.from_landmark.append(array("d", (forward[node] for node in nodes)))
+            self.to_landmark.append(array("d", (backward.get(node, math.inf) for node in nodes)))
+            for i, node in enumerate(nodes):
+                if forward[node] < nearest[i]:
+                    nearest[i] = forward[node]
+            # Next landmark: the reachable node farthest from all chosen ones
+            candidates = [i for i in range(len(nodes)) if nearest[i] != math.inf]
+            landmark = nodes[max(candidates, key=nearest.__getitem__)]
+            if landmark in self.landmarks:
+                break
+
+    def nbytes(self):
+        """Return the size of the distance tables in bytes."""
+        return sum(len(table) * table.itemsize
+                   for table in self.from_landmark + self.to_landmark)
+
+    def heuristic(self, target):
+        """Return heuristic(node), a lower bound on the distance from node to target."""
+        t = self.index[target]
+        rows = [(from_table, to_table, from_table[t], to_table[t])
+                for from_table, to_table in zip(self.from_landmark, self.to_landmark)]
+        index = self.index
+
+        def lower_bound(node):
+            i = index[node]
+            best = 0
+            # inf - inf is nan, which never compares greater, so such
+            # landmarks simply give no bound
+            for from_table, to_table, from_target, to_target in rows:
+                bound = from_target - from_table[i]
+                if bound > best:
+                    best = bound
+                bound = to_table[i] - to_target
+                if bound > best:
+                    best = bound
+            return best
+
+        return lower_bound
+
+
+_CH_MAGIC = b"ContractionHierarchy v1\n"
+
+
+class ContractionHierarchy:
+    """Shortest-path index for many queries on a graph that rarely changes.
+
+    Nodes are contracted one at a time, least important first. Importance
+    is the edge difference (shortcuts added minus edges removed) plus the
+    number of already contracted neighbours, which spreads contraction
+    evenly. Contracting v adds a shortcut u -> x for each pair of
+    neighbours whose shortest path runs through v, unless a bounded
+    witness search finds another path that is no longer. A query then
+    only follows edges towards more important nodes, from both ends, and
+    meets near the top of the hierarchy, settling a few hundred nodes
+    instead of most of the graph. Rebuild it after the graph changes.
+    """
+
+    def __init__(self, graph, witness_limit=64):
+        """Contract graph, a dict of {node: {neighbor: weight}}.
+
+        witness_limit caps the nodes settled by each witness search. Lower
+        values build faster but may add shortcuts that are not needed;
+        queries stay exact either way.
+        """
+        labels = list(graph)
+        ids = {node: i for i, node in enumerate(labels)}
+        for neighbors in graph.values():
+            for neighbor in neighbors:
+                if neighbor not in ids:
+                    ids[neighbor] = len(labels)
+                    labels.append(neighbor)
+        self.labels = labels
+        self.ids = ids
+
+        self._contract(graph, witness_limit)
+
+    def _contract(self, graph, witness_limit):
+        ids = self.ids
+        n = len(self.labels)
+        # Remaining graph, shrinking as nodes are contracted
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        # Integer weights stay integers, so distances match shortest_path's
+        integral = True
+        for node, neighbors in graph.items():
+            u = ids[node]
+            for neighbor, weight in neighbors.items():
+                v = ids[neighbor]
+                integral = integral and isinstance(weight, int)
+                if u != v and weight < out_edges[u].get(v, math.inf):
+                    out_edges[u][v] = weight
+                    in_edges[v][u] = weight
+
+        up = [[] for _ in range(n)]  # u -> v with v more important
+        down = [[] for _ in range(n)]  # v -> u with v more important, stored at u
+        middle = {}  # (u, x) -> contracted node the shortcut skips
+        self.rank = array("i", [0]) * n
+        self.shortcut_count = 0
+        contracted_neighbors = [0] * n
+
+        def shortcuts(v):
+            found = []
+            outgoing = out_edges[v]
+            if not outgoing:
+                return found
+            longest = max(outgoing.values())
+            for u, to_v in in_edges[v].items():
+                # Witness search from u that avoids v, until every
+                # neighbour x is settled or too far to matter
+                limit = to_v + longest
+                distances = {u: 0}
+                pq = [(0, u)]
+                settled = 0
+                pending = len(outgoing) - (u in outgoing)
+                while pq and settled < witness_limit:
+                    d, w = heapq.heappop(pq)
+                    if d > limit:
+                        break
+                    if d > distances[w]:
+                        continue
+                    settled += 1
+                    if w in outgoing and w != u:
+                        pending -= 1
+                        if not pending:
+                            break
+                    for x, weight in out_edges[w].items():
+                        if x != v and d + weight < distances.get(x, math.inf):
+                            distances[x] = d + weight
+                            heapq.heappush(pq, (d + weight, x))
+                for x, from_v in outgoing.items():
+                    if x != u and to_v + from_v < distances.get(x, math.inf):
+                        found.append((u, x, to_v + from_v))
+            return found
+
+        def priority(v, added):
+            return (len(added) - len(in_edges[v]) - len(out_edges[v])
+                    + contracted_neighbors[v])
+
+        pq = [(priority(v, shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(pq)
+        next_rank = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            # Priorities go stale as neighbours are contracted; recheck
+            # lazily and put v back if it is no longer the least important
+            added = shortcuts(v)
+            current = priority(v, added)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+
+            self.rank[v] = next_rank
+            next_rank += 1
+            for x, weight in out_edges[v].items():
+                up[v].append((x, weight, middle.get((v, x), -1)))
+                del in_edges[x][v]
+                contracted_neighbors[x] += 1
+            for u, weight in in_edges[v].items():
+                down[v].append((u, weight, middle.get((u, v), -1)))
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            for u, x, weight in added:
+                if weight < out_edges[u].get(x, math.inf):
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+                    middle[(u, x)] = v
+                    self.shortcut_count += 1
+            out_edges[v] = in_edges[v] = None
+
+        typecode = "q" if integral else "d"
+        self._up = self._flatten(up, typecode)
+        self._down = self._flatten(down, typecode)
+
+    @staticmethod
+    def _flatten(adjacency, typecode):
+        """Return (offsets, heads, weights, middles) arrays for per-node lists of (head, weight, middle)."""
+        offsets = array("q", [0])
+        heads = array("i")
+        weights = array(typecode)
+        middles = array("i")  # Node a shortcut skips, -1 for original edges
+        for edges in adjacency:
+            for head, weight, skipped in edges:
+                heads.append(head)
+                weights.append(weight)
+                middles.append(skipped)
+            offsets.append(len(heads))
+        return offsets, heads, weights, middles
+
+    def edge_count(self):
+        """Return the number of edges in the hierarchy, shortcuts included."""
+        return len(self._up[1]) + len(self._down[1])
+
+    def save(self, path):
+        """Write the hierarchy to path; ContractionHierarchy.load reads it back.
+
+        The file is plain data: a JSON header line with the node labels,
+        then the rank and edge arrays written with array.tofile. Labels
+        must be JSON values; tuples (such as grid coordinates) come back as
+        tuples, so they stay usable as nodes.
+        """
+        arrays = (self.rank,) + self._up + self._down
+        header = {
+            "byteorder": sys.byteorder,
+            "shortcut_count": self.shortcut_count,
+            "weight_typecode": self._up[2].typecode,
+            "lengths": [len(values) for values in arrays],
+            "labels": self.labels,
+        }
+        with open(path, "wb") as f:
+            f.write(_CH_MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            for values in arrays:
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Return the hierarchy saved to path by save(), querying straight from its arrays."""
+        with open(path, "rb") as f:
+            if f.readline() != _CH_MAGIC:
+                raise ValueError(f"{path} is not a saved ContractionHierarchy")
+            header = json.loads(f.readline())
+            # rank, then offsets, heads, weights, middles for the up and down edges
+            typecodes = "i" + ("qi" + header["weight_typecode"] + "i") * 2
+            arrays = []
+            for typecode, length in zip(typecodes, header["lengths"]):
+                values = array(typecode)
+                try:
+                    values.fromfile(f, length)
+                except (EOFError, ValueError):  # Ran out of data mid-array
+                    raise ValueError(f"{path} is truncated") from None
+                if header["byteorder"] != sys.byteorder:
+                    values.byteswap()
+                arrays.append(values)
+
+        def as_label(value):
+            return tuple(map(as_label, value)) if isinstance(value, list) else value
+
+        hierarchy = cls.__new__(cls)
+        hierarchy.labels = [as_label(label) for label in header["labels"]]
+        hierarchy.ids = {node: i for i, node in enumerate(hierarchy.labels)}
+        hierarchy.shortcut_count = header["shortcut_count"]
+        hierarchy.rank = arrays[0]
+        hierarchy._up = tuple(arrays[1:5])
+        hierarchy._down = tuple(arrays[5:9])
+        return hierarchy
+
+    def _middle(self, a, b):
+        """Return the node the hierarchy edge a -> b skips, or -1 for an original edge."""
+        # The edge is stored at whichever end was contracted first
+        if self.rank[a] < self.rank[b]:
+            offsets, heads, _, middles = self._up
+            row, head = a, b
+        else:
+            offsets, heads, _, middles = self._down
+            row, head = b, a
+        for i in range(offsets[row], offsets[row + 1]):
+            if heads[i] == head:
+                return middles[i]
+        raise KeyError((a, b))
+
+    def shortest_path(self, source, target, stats=None):
+        """Return (distance, path) from source to target, or (math.inf, []) if unreachable.
+
+        The path lists original nodes, as get_path does; shortcuts are
+        unpacked into the edges they replace. stats["settled"] counts the
+        nodes settled by both upward searches.
+        """
+        if source not in self.ids or target not in self.ids:
+            raise ValueError("Source and target must be nodes of the graph")
+        s = self.ids[source]
+        t = self.ids[target]
+
+        # Index 0 searches up from source, index 1 up from target (against
+        # edge direction)
+        distances = ({s: 0}, {t: 0})
+        predecessors = ({s: None}, {t: None})
+        queues = ([(0, s)], [(0, t)])
+        edges = (self._up[:3], self._down[:3])
+        best = 0 if s == t else math.inf
+        meeting = s
+        settled = 0
+        side = 0
+
+        while True:
+            # Each side stops once nothing left on it can beat the best path
+            if not queues[side] or queues[side][0][0] >= best:
+                side = 1 - side
+                if not queues[side] or queues[side][0][0] >= best:
+                    break
+            d, u = heapq.heappop(queues[side])
+            own = distances[side]
+            if d > own[u]:
+                continue
+            settled += 1
+            other = distances[1 - side]
+            if u in other and d + other[u] < best:
+                best = d + other[u]
+                meeting = u
+            # Stall-on-demand: skip u if a more important node reaches it
+            # by a shorter path, since u then cannot lie on a shortest path
+            stalled = False
+            offsets, heads, weights = edges[1 - side]
+            for i in range(offsets[u], offsets[u + 1]):
+                x = heads[i]
+                if x in own and own[x] + weights[i] < d:
+                    stalled = True
+                    break
+            if not stalled:
+                offsets, heads, weights = edges[side]
+                for i in range(offsets[u], offsets[u + 1]):
+                    x = heads[i]
+                    distance = d + weights[i]
+                    if distance < own.get(x, math.inf):
+                        own[x] = distance
+                        predecessors[side][x] = u
+                        heapq.heappush(queues[side], (distance, x))
+            side = 1 - side
+
+        if stats is not None:
+            stats["settled"] = settled
+        if best == math.inf:
+            return math.inf, []
+
+        # Chain of hierarchy edges: source up to meeting, then down to target
+        chain = get_path(predecessors[0], meeting)
+        node = predecessors[1][meeting]
+        while node is not None:
+            chain.append(node)
+            node = predecessors[1][node]
+
+        labels = self.labels
+        path = [labels[chain[0]]]
+        for u, x in zip(chain, chain[1:]):
+            stack = [(u, x)]
+            while stack:
+                a, b = stack.pop()
+                middle = self._middle(a, b)
+                if middle < 0:
+                    path.append(labels[b])
+                else:
+                    stack.append((middle, b))
+                    stack.append((a, middle))
+        return best, path
+
+
+def _csr(graph):
+    """Return (labels, ids, indptr, indices, weights): graph as compressed sparse rows.
+
+    Node i is labels[i]; its edges go to indices[indptr[i]:indptr[i + 1]]
+    with the matching weights. Nodes that only appear as neighbours get
+    ids after the keys of graph.
+    """
+    labels = list(graph)
+    ids = {node: i for i, node in enumerate(labels)}
+    indptr = array("q", [0])
+    indices = array("i")
+    weights = array("d")
+    for node in list(labels):
+        for neighbor, weight in graph[node].items():
+            if neighbor not in ids:
+                ids[neighbor] = len(labels)
+                labels.append(neighbor)
+            indices.append(ids[neighbor])
+            weights.append(weight)
+        indptr.append(len(indices))
+    for _ in range(len(labels) - len(graph)):
+        indptr.append(len(indices))
+    return labels, ids, indptr, indices, weights
+
+
+@contextmanager
+def _shared_arrays(arrays):
+    """Copy arrays into one shared memory block; yield (name, layout) for _attach_arrays.
+
+    layout holds (typecode, offset, length) for each array. Offsets are
+    rounded up to 8 bytes so every typed view of the block is aligned.
+    The block is unlinked on exit, once the workers are done with it.
+    """
+    layout = []
+    size = 0
+    for values in arrays:
+        size += -size % 8
+        layout.append((values.typecode, size, len(values)))
+        size += len(values) * values.itemsize
+    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        for values, (_, offset, _) in zip(arrays, layout):
+            view = memoryview(values).cast("B")
+            block.buf[offset:offset + len(view)] = view
+        yield block.name, layout
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _attach_arrays(name, layout, targets):
+    """Pool initializer: view the graph arrays shared by distance_matrix and keep the target ids."""
+    global _worker_graph
+    # Only the parent unlinks the block. Workers inherit its resource
+    # tracker, so attaching by name must not register the block again.
+    block = shared_memory.SharedMemory(name=name)
+    views = [block.buf[offset:offset + length * array(typecode).itemsize].cast(typecode)
+             for typecode, offset, length in layout]
+    _worker_graph = (block, *views, targets)
+
+
+def _distance_rows(indptr, indices, weights, node_count, sources, targets):
+    """Return one array('d') row of distances to the target ids per source id."""
+    rows = []
+    for source in sources:
+        distances = array("d", [math.inf]) * node_count
+        distances[source] = 0
+        settled = bytearray(node_count)
+        # Stop early once every target is settled
+        pending = set(targets)
+        pq = [(0, source)]
+        while pq and pending:
+            current_distance, current_node = heapq.heappop(pq)
+            if settled[current_node]:
+                continue
+            settled[current_node] = 1
+            pending.discard(current_node)
+            start, end = indptr[current_node], indptr[current_node + 1]
+            for neighbor, weight in zip(indices[start:end], weights[start:end]):
+                distance = current_distance + weight
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    heapq.heappush(pq, (distance, neighbor))
+        rows.append(array("d", (distances[target] for target in targets)))
+    return rows
+
+
+def _distance_task(sources):
+    """Pool task: run _distance_rows for a chunk of source ids on the shared CSR."""
+    _, indptr, indices, weights, targets = _worker_graph
+    return _distance_rows(indptr, indices, weights, len(indptr) - 1, sources, targets)
+
+
+def distance_matrix(graph, sources, targets=None, workers=None):
+    """Return shortest distances from each source to each target as a flat array('d').
+
+    The result is row-major: the distance from sources[i] to targets[j] is
+    at index i * len(targets) + j, and math.inf if there is no path.
+    targets defaults to every node. The graph is exported once as CSR
+    arrays into shared memory and the sources are split into chunks
+    across a pool of worker processes, so only source ids and result rows
+    are pickled and each worker holds one O(nodes) search at a time.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError("workers must be at least 1")
+    labels, ids, indptr, indices, weights = _csr(graph)
+    if targets is None:
+        targets = labels
+    if any(node not in ids for node in sources) or any(node not in ids for node in targets):
+        raise ValueError("Sources and targets must be nodes of the graph")
+    source_ids = [ids[node] for node in sources]
+    target_ids = array("i", (ids[node] for node in targets))
+    node_count = len(labels)
+
+    matrix = array("d")
+    if workers == 1 or len(source_ids) < 2:
+        for row in _distance_rows(indptr, indices, weights, node_count, source_ids, target_ids):
+            matrix.extend(row)
+        return matrix
+
+    # Small chunks keep workers busy when some sources search much further
+    size = max(1, -(-len(source_ids) // (4 * workers)))
+    chunks = [source_ids[i:i + size] for i in range(0, len(source_ids), size)]
+    with _shared_arrays((indptr, indices, weights)) as (name, layout):
+        with Pool(workers, initializer=_attach_arrays,
+                  initargs=(name, layout, target_ids)) as pool:
+            for rows in pool.imap(_distance_task, chunks):
+                for row in rows:
+                    matrix.extend(row)
+    return matrix
+
+
+def _grid_graph(width, height, seed=0):
+    """Return a road-network-like grid: each cell linked both ways to its neighbors, weights 1-10."""
+    rng = random.Random(seed)
+    graph = {(x, y): {} for x in range(width) for y in range(height)}
+    for x in range(width):
+        for y in range(height):
+            for nx, ny in ((x + 1, y), (x, y + 1)):
+                if nx < width and ny < height:
+                    weight = rng.randint(1, 10)
+                    graph[(x, y)][(nx, ny)] = weight
+                    graph[(nx, ny)][(x, y)] = weight
+    return graph
+
+
+def compare_point_to_point(width=300, height=300, query_count=20):
+    """Print the average latency and settled nodes of dijkstra vs the point-to-point searches."""
+    graph = _grid_graph(width, height)
+    reverse = reverse_graph(graph)
+    rng = random.Random(1)
+    nodes = list(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(query_count)]
+
+    def full(source, target, stats):
+        distances, predecessors = dijkstra(graph, source)
+        stats["settled"] = sum(1 for d in distances.values() if d != math.inf)
+        return distances[target], get_path(predecessors, target)
+
+    searches = (
+        ("dijkstra + get_path", full),
+        ("shortest_path", lambda s, t, stats: shortest_path(graph, s, t, stats)),
+        ("bidirectional", lambda s, t, stats: bidirectional_shortest_path(graph, s, t, reverse, stats)),
+    )
+    for name, search in searches:
+        settled = 0
+        start = time.perf_counter()
+        for source, target in queries:
+            stats = {}
+            search(source, target, stats)
+            settled += stats["settled"]
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed / query_count * 1000:.1f} ms/query, "
+              f"{settled // query_count} nodes settled")
+
+
+def compare_astar(width=300, height=300, query_count=20, landmark_count=8):
+    """Print the average latency and expanded nodes of dijkstra vs astar with grid and ALT heuristics."""
+    graph = _grid_graph(width, height)
+    rng = random.Random(1)
+    nodes = list(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    landmarks = Landmarks(graph, landmark_count)
+    elapsed = time.perf_counter() - start
+    print(f"  ALT preprocessing: {landmark_count} landmarks in {elapsed:.2f} s, "
+          f"{landmarks.nbytes() / 2**20:.1f} MiB of tables")
+
+    def full(source, target, stats):
+        distances, predecessors = dijkstra(graph, source)
+        stats["settled"] = sum(1 for d in distances.values() if d != math.inf)
+        return distances[target], get_path(predecessors, target)
+
+    def manhattan(source, target, stats):
+        # Every edge weighs at least 1, so grid steps never overestimate
+        tx, ty = target
+        return astar(graph, source, target,
+                     lambda node: abs(node[0] - tx) + abs(node[1] - ty), stats)
+
+    searches = (
+        ("dijkstra + get_path", full),
+        ("shortest_path", lambda s, t, stats: shortest_path(graph, s, t, stats)),
+        ("astar (manhattan)", manhattan),
+        ("astar (ALT)", lambda s, t, stats: astar(graph, s, t, landmarks.heuristic(t), stats)),
+    )
+    for name, search in searches:
+        expanded = 0
+        start = time.perf_counter()
+        for source, target in queries:
+            stats = {}
+            search(source, target, stats)
+            expanded += stats["settled"]
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed / query_count * 1000:.1f} ms/query, "
+              f"{expanded // query_count} nodes expanded")
+
+
+def compare_contraction_hierarchy(width=100, height=100, query_count=200):
+    """Print build, save/load and query costs of ContractionHierarchy vs the online searches."""
+    graph = _grid_graph(width, height)
+    reverse = reverse_graph(graph)
+    rng = random.Random(1)
+    nodes = list(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy(graph)
+    elapsed = time.perf_counter() - start
+    print(f"  build: {elapsed:.2f} s, {hierarchy.shortcut_count} shortcuts, "
+          f"{hierarchy.edge_count()} edges in the hierarchy")
+
+    fd, path = tempfile.mkstemp(suffix=".ch")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        hierarchy.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        hierarchy = ContractionHierarchy.load(path)
+        loaded = time.perf_counter() - start
+        print(f"  save: {saved * 1000:.0f} ms, load: {loaded * 1000:.0f} ms, "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB on disk")
+    finally:
+        os.remove(path)
+
+    searches = (
+        ("shortest_path", lambda s, t, stats: shortest_path(graph, s, t, stats)),
+        ("bidirectional", lambda s, t, stats: bidirectional_shortest_path(graph, s, t, reverse, stats)),
+        ("contraction hierarchy", hierarchy.shortest_path),
+    )
+    for name, search in searches:
+        settled = 0
+        start = time.perf_counter()
+        for source, target in queries:
+            stats = {}
+            search(source, target, stats)
+            settled += stats["settled"]
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed / query_count * 1000:.2f} ms/query, "
+              f"{settled // query_count} nodes settled")
+
+
+def compare_distance_matrix(width=200, height=200, source_count=40):
+    """Print the time of a dijkstra loop vs distance_matrix with one and all workers."""
+    graph = _grid_graph(width, height)
+    rng = random.Random(1)
+    nodes = list(graph)
+    sources = rng.sample(nodes, source_count)
+
+    start = time.perf_counter()
+    rows = [dijkstra(graph, source)[0] for source in sources]
+    elapsed = time.perf_counter() - start
+    print(f"  dijkstra loop: {elapsed:.2f} s")
+    del rows
+
+    counts = sorted({1, 2, os.cpu_count() or 1})
+    for workers in counts:
+        start = time.perf_counter()
+        distance_matrix(graph, sources, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"  distance_matrix, {workers} worker(s): {elapsed:.2f} s")
+
+
+def run_benchmarks():
+    """Time the search variants on grid graphs."""
+    print("Point-to-point search on a 300x300 grid:")
+    compare_point_to_point()
+    print("\nA* search on a 300x300 grid:")
+    compare_astar()
+    print("\nContraction hierarchy on a 100x100 grid:")
+    compare_contraction_hierarchy()
+    print(f"\nDistance matrix on a 200x200 grid ({os.cpu_count()} CPUs):")
+    compare_distance_matrix()
+
+
 # Example usage
 if __name__ == "__main__":
     # Graph represented as adjacency list with weights
@@ -74,3 +914,21 @@ if __name__ == "__main__":
         print(f"To {node}: {distance}")
         if distance != math.inf:
             print(f"Path: {' -> '.join(get_path(predecessors, node))}")
+
+    # Point-to-point queries
+    distance, path = shortest_path(graph, 'A', 'E')
+    print(f"\nA to E: {distance} via {' -> '.join(path)}")
+    distance, path = bidirectional_shortest_path(graph, 'A', 'E')
+    print(f"Bidirectional A to E: {distance} via {' -> '.join(path)}")
+    landmarks = Landmarks(graph, 2)
+    distance, path = astar(graph, 'A', 'E', landmarks.heuristic('E'))
+    print(f"A* (ALT) A to E: {distance} via {' -> '.join(path)}")
+    hierarchy = ContractionHierarchy(graph)
+    distance, path = hierarchy.shortest_path('A', 'E')
+    print(f"Contraction hierarchy A to E: {distance} via {' -> '.join(path)}")
+    matrix = distance_matrix(graph, ['A', 'B'], ['D', 'E'], workers=1)
+    print(f"Distances from A, B to D, E: {list(matrix)}")
+
+    if "--bench" in sys.argv[1:]:
+        print()
+        run_benchmarks()
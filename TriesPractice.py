@@ -1,12 +1,1803 @@
+import bisect
+import gc
+import heapq
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+
+# Maps the bytes of 'a'-'z' to child indices 0-25 in a single translate call
+_CHILD_INDEX = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", bytes(range(26)))
+# Like _CHILD_INDEX, but every other byte maps to 26 (no letter) for scanning
+_SCAN_CODE = bytes(byte - 97 if 97 <= byte <= 122 else 26 for byte in range(256))
+
+
+@contextmanager
+def _gc_paused():
+    """Turn off cyclic GC during insert_many and from_sorted; ConcurrentTrie skips it since the switch is process-wide."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _batch_child_indices(words: list) -> bytes:
+    """
+    Validate a batch of words and translate them to child indices at once.
+
+    The words are joined so that the character checks and the translation
+    each run as a single C-level call over the whole batch.
+
+    Args:
+        words: The words to translate.
+
+    Returns:
+        bytes: The child index (0-25) of every character, word after word.
+
+    Raises:
+        TypeError: If a word is not a string.
+        ValueError: If a word is empty or contains non-lowercase letters.
+    """
+    try:
+        text = "".join(words)
+    except TypeError:
+        raise TypeError("Word must be a string") from None
+    if not all(words):
+        raise ValueError("Word cannot be empty")
+    if text and not (text.isascii() and text.isalpha() and text.islower()):
+        raise ValueError("Word must contain only lowercase letters a-z")
+    return text.encode("ascii").translate(_CHILD_INDEX)
+
+
+def _fuzzy_walk(root, word: str, max_distance: int, children) -> list[tuple[str, int]]:
+    """
+    Find words within max_distance edits of word by walking a trie.
+
+    Each visited node carries one row of the Levenshtein table for the path
+    leading to it, computed from its parent's row. Only cells within
+    max_distance of the diagonal can stay under the bound, so the rest of
+    the row is left at max_distance + 1. A branch is pruned once every cell
+    of its row exceeds max_distance, since edits can only grow further down.
+
+    Args:
+        root: Root node of the trie.
+        word: The word to match.
+        max_distance: Largest edit distance to report.
+        children: Function returning a node's (char, child) pairs.
+
+    Returns:
+        list[tuple[str, int]]: (word, distance) pairs, closest first and
+            alphabetical within a distance.
+    """
+    size = len(word)
+    over = max_distance + 1  # Stands in for every distance past the bound
+    matches = []
+    first_row = [min(i, over) for i in range(size + 1)]
+    if root.is_end_of_word and first_row[-1] <= max_distance:
+        matches.append(("", first_row[-1]))
+    buffer = []
+    stack = [(child, 1, char, first_row) for char, child in children(root)]
+    while stack:
+        node, depth, char, previous = stack.pop()
+        del buffer[depth - 1:]
+        buffer.append(char)
+
+        row = [over] * (size + 1)
+        if depth <= max_distance:
+            row[0] = depth
+        low = max(1, depth - max_distance)
+        high = min(size, depth + max_distance)
+        for i in range(low, high + 1):
+            cost = previous[i - 1] + (word[i - 1] != char)
+            if row[i - 1] < cost:
+                cost = row[i - 1] + 1
+            if previous[i] < cost:
+                cost = previous[i] + 1
+            row[i] = cost if cost < over else over
+
+        if row[size] <= max_distance and node.is_end_of_word:
+            matches.append(("".join(buffer), row[size]))
+        band = row[low - 1:high + 1]  # Includes row[0] while it may count
+        if band and min(band) <= max_distance:
+            stack.extend((child, depth + 1, next_char, row)
+                         for next_char, child in children(node))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches
+
+
+class BloomFilter:
+    """
+    A Bloom filter over strings: a bit array probed by hash_count hashes.
+
+    A word that was added is always reported present; a word that was not
+    is reported present only with probability about false_positive_rate
+    while at most capacity words have been added. The probe positions come
+    from Python's str hash (double hashing), which is cached on the string
+    but differs between processes, so the filter is never saved.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """
+        Size the filter for capacity words at the given false-positive rate.
+
+        Args:
+            capacity: Number of words the filter is sized for.
+            false_positive_rate: Target probability of a false positive,
+                strictly between 0 and 1.
+
+        Raises:
+            TypeError: If an argument is not a number.
+            ValueError: If capacity is not positive or the rate is not
+                strictly between 0 and 1.
+        """
+        if not isinstance(capacity, int):
+            raise TypeError("Capacity must be an integer")
+        if not isinstance(false_positive_rate, (int, float)):
+            raise TypeError("False-positive rate must be a number")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("False-positive rate must be between 0 and 1")
+        # Optimal bit count, rounded up to a power of two so a mask can
+        # replace the modulo (which only lowers the rate further)
+        wanted = -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        self.size = 1 << max(3, math.ceil(math.log2(wanted)))
+        self.hash_count = max(1, math.ceil(-math.log2(false_positive_rate)))
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.count = 0  # Words added, including repeats
+        self._bits = bytearray(self.size >> 3)
+
+    def add(self, word: str) -> None:
+        """
+        Add a word to the filter.
+
+        Args:
+            word: The word to add.
+        """
+        h = hash(word) & 0xFFFFFFFFFFFFFFFF
+        step = (h >> 32) | 1  # Odd, so the probes never cycle early
+        mask = self.size - 1
+        bits = self._bits
+        for _ in range(self.hash_count):
+            position = h & mask
+            bits[position >> 3] |= 1 << (position & 7)
+            h += step
+        self.count += 1
+
+    def __contains__(self, word: str) -> bool:
+        """
+        Check whether word may have been added.
+
+        Args:
+            word: The word to check.
+
+        Returns:
+            bool: False if word was certainly never added, True otherwise.
+        """
+        h = hash(word) & 0xFFFFFFFFFFFFFFFF
+        step = (h >> 32) | 1
+        mask = self.size - 1
+        bits = self._bits
+        for _ in range(self.hash_count):
+            position = h & mask
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+            h += step
+        return True
+
+
 class TrieNode:
+    __slots__ = ("children", "is_end_of_word", "weight", "top", "count")
+
     def __init__(self):
         self.children = [None] * 26  # Array for a-z (26 lowercase letters)
         self.is_end_of_word = False  # Flag to mark end of a word
+        self.weight = 0  # Weight of the word ending here
+        self.top = None  # Heaviest (-weight, word) pairs in this subtree, if cached
+        self.count = 0  # Number of complete words in this subtree
+
+
+# The dict-based classes further down reuse the names TrieNode and Trie, so
+# keep stable aliases for the array-based versions.
+ArrayTrieNode = TrieNode
+
+
+class Trie:
+    _bloom = None  # Optional BloomFilter in front of contains_word
+
+    def __init__(self, top_k: int = None):
+        """
+        Create an empty Trie.
+
+        Args:
+            top_k: If given, every node caches its top_k heaviest
+                completions so autocomplete(prefix, k) with k <= top_k does
+                not scan the subtree. The cache makes inserts and removals
+                slower, so it is off by default.
+
+        Raises:
+            ValueError: If top_k is less than 1.
+        """
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.root = ArrayTrieNode()  # Initialize root node
+        self.top_k = top_k
+        self._shared = False  # True once from_sorted has merged suffixes
+
+    @classmethod
+    def from_sorted(cls, words) -> "Trie":
+        """
+        Build a Trie from sorted words, merging shared suffixes (a DAWG).
+
+        Words are streamed one at a time, so a file object can be passed
+        directly; trailing newlines are stripped. Once a word is added, the
+        part of the previous word it does not share can no longer change, so
+        those nodes are replaced by an identical node seen earlier if there
+        is one. The result is the minimal acyclic automaton for the words.
+        Until then a node is only a small list, and a TrieNode is created
+        just for each node that is not a duplicate.
+
+        Args:
+            words: Iterable of words in ascending order (duplicates allowed).
+
+        Returns:
+            Trie: A Trie whose nodes may be shared between several words.
+
+        Raises:
+            TypeError: If a word is not a string.
+            ValueError: If a word is empty, contains non-lowercase letters or
+                is out of order.
+        """
+        trie = cls()
+        # Nodes hash and compare by identity, so (is_end_of_word, index,
+        # child, index, child, ...) identifies a node with final children
+        register = {}
+        # The previous word's unminimized nodes, kept as light [is_end,
+        # edges, index] lists: edges alternates child index and canonical
+        # node, and index is the node's own position in its parent
+        path = [[False, [], None]]
+        previous = ""
+
+        def _minimize(down_to: int) -> None:
+            """
+            Replace path nodes deeper than down_to by registered twins.
+
+            Args:
+                down_to: Depth of the deepest node that may still change.
+            """
+            for _ in range(len(path) - 1 - down_to):
+                is_end, edges, index = path.pop()
+                key = (is_end, *edges)
+                node = register.get(key)
+                if node is None:
+                    node = ArrayTrieNode()
+                    children = node.children
+                    count = is_end
+                    for i in range(0, len(edges), 2):
+                        child = edges[i + 1]
+                        children[edges[i]] = child
+                        count += child.count
+                    node.is_end_of_word = is_end
+                    node.weight = int(is_end)
+                    node.count = count
+                    register[key] = node
+                path[-1][1] += (index, node)
+
+        with _gc_paused():
+            for word in words:
+                if not isinstance(word, str):
+                    raise TypeError("Word must be a string")
+                word = word.rstrip("\r\n")
+                if not word:
+                    raise ValueError("Word cannot be empty")
+                # Same check as insert_word, but done by str methods in one pass
+                if not (word.isascii() and word.isalpha() and word.islower()):
+                    raise ValueError(
+                        "Word must contain only lowercase letters a-z")
+                if word <= previous:
+                    if word == previous:
+                        continue
+                    raise ValueError("Words must be in sorted order")
+
+                common = 0
+                for a, b in zip(previous, word):
+                    if a != b:
+                        break
+                    common += 1
+                _minimize(common)
+
+                for index in word[common:].encode().translate(_CHILD_INDEX):
+                    path.append([False, [], index])
+                path[-1][0] = True
+                previous = word
+
+            _minimize(0)
+        root = trie.root
+        edges = path[0][1]
+        for i in range(0, len(edges), 2):
+            root.children[edges[i]] = edges[i + 1]
+            root.count += edges[i + 1].count
+        trie._shared = True
+        return trie
+
+    def _unshare_path(self, word: str) -> None:
+        """
+        Give word's path private copies of its nodes before it is modified.
+
+        Nodes built by from_sorted can be reachable through several words,
+        so they are copied along the path (copy-on-write) and the rest of the
+        graph stays shared.
+
+        Args:
+            word: The word whose path is about to change.
+        """
+        curr = self.root
+        for char in word:
+            index = ord(char) - ord('a')
+            child = curr.children[index]
+            if not child:
+                return
+            copy = ArrayTrieNode()
+            copy.children = child.children[:]
+            copy.is_end_of_word = child.is_end_of_word
+            copy.weight = child.weight
+            copy.top = child.top
+            copy.count = child.count
+            curr.children[index] = copy
+            curr = copy
+
+    def _refresh_path(self, path: list, word: str, old: tuple = None) -> None:
+        """
+        Update the word counts and cached top completions on word's path.
+
+        Every node on the path gains or loses word only if it was added or
+        removed, so the counts are adjusted by the same amount. Only word's
+        entry can have changed, so most caches are patched in place. A cache
+        is rebuilt from its own word and its children's caches (already
+        sorted and up to date, since the path is processed bottom-up) only
+        when word drops out of it or loses weight, because then a completion
+        that did not make the cut may now belong there.
+
+        Args:
+            path: Nodes from the root down to the end of word (or as far as
+                the path still exists).
+            word: The word that was inserted or removed.
+            old: The (-weight, word) entry word had before, if it was present.
+        """
+        end = path[-1]
+        present = len(path) == len(word) + 1 and end.is_end_of_word
+        delta = present - (old is not None)
+        if delta:
+            for node in path:  # Private nodes, even after from_sorted
+                node.count += delta
+        limit = self.top_k
+        if limit is None or self._shared:
+            return  # No cache, or shared nodes that cannot hold one
+        entry = (-end.weight, word) if present else None
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            top = node.top
+            if top is None:
+                top = node.top = []  # New node
+            if old is not None and old in top:
+                if entry is None or entry > old:
+                    own = [(-node.weight, word[:depth])] if node.is_end_of_word else []
+                    node.top = list(islice(heapq.merge(
+                        own, *(child.top for child in node.children if child)),
+                        limit))
+                    continue
+                top.remove(old)
+            if entry is not None and (len(top) < limit or entry < top[-1]):
+                bisect.insort(top, entry)
+                del top[limit:]
+
+    def insert_word(self, word: str, weight: float = 1) -> None:
+        """
+        Insert a word into the Trie, or update its weight if it is present.
+
+        Args:
+            word: The word to insert.
+            weight: How strongly autocomplete(prefix, k) should prefer it.
+
+        Raises:
+            TypeError: If word is not a string or weight is not a number.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+        if not isinstance(weight, (int, float)):
+            raise TypeError("Weight must be a number")
+        if self._shared:
+            self._unshare_path(word)
+
+        curr = self.root
+        path = [curr]
+        for char in word:
+            index = ord(char) - ord('a')  # Map 'a' to 0, 'b' to 1, etc.
+            if not curr.children[index]:
+                curr.children[index] = ArrayTrieNode()
+            curr = curr.children[index]
+            path.append(curr)
+        old = (-curr.weight, word) if curr.is_end_of_word else None
+        curr.is_end_of_word = True
+        curr.weight = weight
+        self._refresh_path(path, word, old)
+        if self._bloom is not None and old is None:
+            self._bloom.add(word)
+            self._bloom_stale = self._bloom_is_stale()
+
+    def enable_bloom_filter(self, false_positive_rate: float = 0.01,
+                            capacity: int = None) -> None:
+        """
+        Put a Bloom filter in front of contains_word and contains_many.
+
+        Most misses are then answered without touching the nodes. The
+        filter is filled from the current words and kept up to date by
+        inserts. Removed words cannot be taken out of a Bloom filter, so
+        they only make it less selective; once removals reach half of the
+        words added, or the Trie outgrows capacity, the filter is rebuilt on
+        the next lookup. Counters start from zero; see bloom_stats().
+
+        Args:
+            false_positive_rate: Target probability that a missing word gets
+                past the filter.
+            capacity: Number of words to size the filter for. Defaults to
+                twice the current word count (at least 1024), and doubles
+                with the word count on rebuilds.
+
+        Raises:
+            TypeError: If an argument is not a number.
+            ValueError: If capacity is not positive or the rate is not
+                strictly between 0 and 1.
+        """
+        if capacity is None:
+            capacity = max(2 * self.root.count, 1024)
+        self._bloom = BloomFilter(capacity, false_positive_rate)
+        for word, _ in self._iter_subtree(self.root, ""):
+            self._bloom.add(word)
+        self._bloom_removed = 0  # Removals since the filter was built
+        self._bloom_stale = False  # Rebuild before the next lookup
+        self.bloom_hits = 0  # Lookups that found the word
+        self.bloom_misses = 0  # Lookups that did not, rejected or not
+        self.bloom_rejects = 0  # Misses answered by the filter alone
+
+    def disable_bloom_filter(self) -> None:
+        """Drop the Bloom filter and its counters."""
+        self._bloom = None
+
+    def bloom_stats(self) -> dict:
+        """
+        Return the Bloom filter's counters and size.
+
+        false_positives counts the misses the filter let through to the
+        nodes; divided by the misses it estimates the actual rate.
+
+        Returns:
+            dict: hits, misses, rejects, false_positives, bits, hashes and
+                rebuild-pending status, or an empty dict without a filter.
+        """
+        bloom = self._bloom
+        if bloom is None:
+            return {}
+        return {
+            "hits": self.bloom_hits,
+            "misses": self.bloom_misses,
+            "rejects": self.bloom_rejects,
+            "false_positives": self.bloom_misses - self.bloom_rejects,
+            "bits": bloom.size,
+            "hashes": bloom.hash_count,
+            "stale": self._bloom_stale,
+        }
+
+    def _bloom_is_stale(self) -> bool:
+        """Return True if the filter should be rebuilt before the next use."""
+        return (2 * self._bloom_removed >= max(self._bloom.count, 1)
+                or self.root.count > self._bloom.capacity)
+
+    def _rebuild_bloom_filter(self) -> BloomFilter:
+        """Rebuild the stale Bloom filter, keeping its counters and rate."""
+        bloom = self._bloom
+        capacity = max(bloom.capacity, 2 * self.root.count)
+        counters = (self.bloom_hits, self.bloom_misses, self.bloom_rejects)
+        self.enable_bloom_filter(bloom.false_positive_rate, capacity)
+        self.bloom_hits, self.bloom_misses, self.bloom_rejects = counters
+        return self._bloom
+
+    def contains_word(self, word: str) -> bool:
+        """
+        Check if a word exists in the Trie and is marked as complete.
+
+        Args:
+            word: The word to check.
+
+        Returns:
+            bool: True if the word is complete, False otherwise.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+        bloom = self._bloom
+        if bloom is not None:
+            if self._bloom_stale:
+                bloom = self._rebuild_bloom_filter()
+            if word not in bloom:
+                self.bloom_misses += 1
+                self.bloom_rejects += 1
+                return False
+
+        curr = self.root
+        for char in word:
+            curr = curr.children[ord(char) - ord('a')]  # Map 'a' to 0, etc.
+            if not curr:
+                break
+        found = bool(curr) and curr.is_end_of_word
+        if bloom is not None:
+            if found:
+                self.bloom_hits += 1
+            else:
+                self.bloom_misses += 1
+        return found
+
+    def insert_many(self, words, weight: float = 1) -> None:
+        """
+        Insert many words, validating and translating the batch only once.
+
+        Nothing is inserted if any word is invalid. The cyclic garbage
+        collector is paused during the load.
+
+        Args:
+            words: Iterable of words to insert.
+            weight: Weight given to every inserted word.
+
+        Raises:
+            TypeError: If a word is not a string or weight is not a number.
+            ValueError: If a word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(weight, (int, float)):
+            raise TypeError("Weight must be a number")
+        words = list(words)
+        all_indices = _batch_child_indices(words)
+        if self._shared:
+            for word in words:  # Every path has to be unshared first
+                self.insert_word(word, weight)
+            return
+
+        bloom = self._bloom
+        with _gc_paused():
+            start = 0
+            for word in words:
+                end = start + len(word)
+                curr = self.root
+                path = [curr]
+                for index in all_indices[start:end]:
+                    child = curr.children[index]
+                    if not child:
+                        child = curr.children[index] = ArrayTrieNode()
+                    curr = child
+                    path.append(curr)
+                old = (-curr.weight, word) if curr.is_end_of_word else None
+                curr.is_end_of_word = True
+                curr.weight = weight
+                self._refresh_path(path, word, old)
+                if bloom is not None and old is None:
+                    bloom.add(word)
+                start = end
+        if bloom is not None:
+            self._bloom_stale = self._bloom_is_stale()
+
+    def contains_many(self, words) -> list[bool]:
+        """
+        Check many words, validating and translating the batch only once.
+
+        Repeated tokens are answered from the result of their first
+        occurrence. With a Bloom filter enabled, only the words it does not
+        reject are walked.
+
+        Args:
+            words: Iterable of words to check.
+
+        Returns:
+            list[bool]: Whether each word is in the Trie, in input order.
+
+        Raises:
+            TypeError: If a word is not a string.
+            ValueError: If a word is empty or contains non-lowercase letters.
+        """
+        words = list(words)
+        all_indices = _batch_child_indices(words)
+        bloom = self._bloom
+        if bloom is not None and self._bloom_stale:
+            bloom = self._rebuild_bloom_filter()
+        root = self.root
+        results = []
+        known = {}  # word -> result for tokens already checked
+        start = 0
+        for word in words:
+            end = start + len(word)
+            found = known.get(word)
+            if found is None:
+                if bloom is not None and word not in bloom:
+                    self.bloom_misses += 1
+                    self.bloom_rejects += 1
+                    found = known[word] = False
+                else:
+                    curr = root
+                    for index in all_indices[start:end]:
+                        curr = curr.children[index]
+                        if not curr:
+                            break
+                    found = known[word] = bool(curr) and curr.is_end_of_word
+                    if bloom is not None:
+                        if found:
+                            self.bloom_hits += 1
+                        else:
+                            self.bloom_misses += 1
+            results.append(found)
+            start = end
+        return results
+
+    def fuzzy_search(self, word: str, max_distance: int) -> list[tuple[str, int]]:
+        """
+        Return the words within max_distance edits (Levenshtein) of word.
+
+        Args:
+            word: The word to match.
+            max_distance: Largest number of inserted, deleted or replaced
+                characters allowed.
+
+        Returns:
+            list[tuple[str, int]]: (word, distance) pairs, closest first.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters,
+                or max_distance is negative.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+        if max_distance < 0:
+            raise ValueError("Max distance cannot be negative")
+
+        return _fuzzy_walk(
+            self.root, word, max_distance,
+            lambda node: [(chr(index + ord('a')), child)
+                          for index, child in enumerate(node.children) if child])
+
+    def remove_word(self, word: str) -> None:
+        """
+        Remove a word from the Trie using recursion.
+
+        Args:
+            word: The word to remove.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        def _remove_recursive(node: TrieNode, word: str, index: int) -> bool:
+            """
+            Helper method to recursively remove a word.
+
+            Args:
+                node: Current node in the Trie.
+                word: The word being removed.
+                index: Current character index in the word.
+
+            Returns:
+                bool: True if the current node can be deleted, False otherwise.
+            """
+            # Base case: reached the end of the word
+            if index == len(word):
+                if not node.is_end_of_word:
+                    return False  # Word not found
+                node.is_end_of_word = False  # Unmark as end of word
+                node.weight = 0
+                # Return True if node has no children and is not end of another word
+                return not any(node.children)
+
+            char = word[index]
+            char_index = ord(char) - ord('a')
+            if not node.children[char_index]:
+                return False  # Word not found
+
+            # Recursively remove the next character
+            should_delete_child = _remove_recursive(
+                node.children[char_index], word, index + 1)
+
+            # If child can be deleted, remove it
+            if should_delete_child:
+                node.children[char_index] = None
+                # Return True if current node has no children and is not end of a word
+                return not any(node.children) and not node.is_end_of_word
+
+            # Node cannot be deleted (has other children or is end of a word)
+            return False
+
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+        curr = self.root
+        path = [curr]
+        for char in word:
+            curr = curr.children[ord(char) - ord('a')]
+            if not curr:
+                return  # Word not found
+            path.append(curr)
+        if not curr.is_end_of_word:
+            return  # Word not found
+        old = (-curr.weight, word)
+        if self._shared:
+            self._unshare_path(word)
+        if self._bloom is not None:
+            self._bloom_removed += 1
+            self._bloom_stale = self._bloom_is_stale()
+
+        _remove_recursive(self.root, word, 0)
+
+        if self._shared or self.top_k is not None:
+            # Take the path again: it was copied, or caches must skip pruned nodes
+            curr = self.root
+            path = [curr]
+            for char in word:
+                curr = curr.children[ord(char) - ord('a')]
+                if not curr:
+                    break
+                path.append(curr)
+        self._refresh_path(path, word, old)
+
+    def autocomplete(self, prefix: str, k: int = None) -> list[str]:
+        """
+        Return a list of words in the Trie that start with the given prefix.
+
+        Args:
+            prefix: The prefix to search for.
+            k: If given, return only the k heaviest words (ties broken
+                alphabetically). On a Trie created with top_k >= k this is
+                read straight from the prefix node's cache, whatever the
+                size of the subtree.
+
+        Returns:
+            list[str]: List of complete words starting with the prefix.
+
+        Raises:
+            TypeError: If prefix is not a string.
+            ValueError: If prefix contains non-lowercase letters or k is
+                negative.
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Prefix must be a string")
+        for char in prefix:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Prefix must contain only lowercase letters a-z")
+        if k is not None and k < 0:
+            raise ValueError("k cannot be negative")
+
+        # Traverse to the node corresponding to the prefix
+        curr = self.root
+        for char in prefix:
+            index = ord(char) - ord('a')
+            if not curr.children[index]:
+                return []  # Prefix not found
+            curr = curr.children[index]
+
+        if (k is not None and self.top_k is not None and k <= self.top_k
+                and not self._shared):
+            return [word for _, word in (curr.top or ())[:k]]
+
+        # Collect all words starting from the prefix's node
+        if k is not None:
+            return [word for _, word in heapq.nsmallest(
+                k, ((-node.weight, word)
+                    for word, node in self._iter_subtree(curr, prefix)))]
+        return [word for word, _ in self._iter_subtree(curr, prefix)]
+
+    def _iter_subtree(self, node: TrieNode, prefix: str, after: str = None):
+        """
+        Yield (word, node) for every word under node in lexicographic order.
+
+        The walk uses an explicit stack and a single character buffer, so
+        deep words cannot hit the recursion limit and a word's string is
+        only built when it is yielded.
+
+        Args:
+            node: The node reached by prefix.
+            prefix: The characters leading to node.
+            after: Optional cursor starting with prefix; only words greater
+                than it are yielded.
+
+        Yields:
+            tuple: (word, end node of word).
+        """
+        buffer = list(prefix)
+        nodes = [node]  # Stack of nodes being expanded
+        next_index = [0]  # Next child index to try for each stacked node
+
+        if after is None:
+            if node.is_end_of_word:
+                yield prefix, node
+        else:
+            # Resume from the cursor: skip everything up to its path
+            for char in after[len(prefix):]:
+                index = ord(char) - ord('a')
+                next_index[-1] = index + 1
+                child = nodes[-1].children[index]
+                if not child:
+                    break
+                buffer.append(char)
+                nodes.append(child)
+                next_index.append(0)
+
+        while nodes:
+            children = nodes[-1].children
+            index = next_index[-1]
+            while index < 26 and not children[index]:
+                index += 1
+            if index == 26:
+                nodes.pop()
+                next_index.pop()
+                if nodes:
+                    buffer.pop()
+                continue
+            next_index[-1] = index + 1
+            child = children[index]
+            buffer.append(chr(index + ord('a')))
+            nodes.append(child)
+            next_index.append(0)
+            if child.is_end_of_word:
+                yield "".join(buffer), child
+
+    def iter_autocomplete(self, prefix: str, *, limit: int = None,
+                          after: str = None):
+        """
+        Lazily yield the words starting with prefix in lexicographic order.
+
+        Results can be paged by passing the last word of one page as after
+        for the next one.
+
+        Args:
+            prefix: The prefix to search for.
+            limit: Maximum number of words to yield.
+            after: Cursor; only words greater than it are yielded.
+
+        Yields:
+            str: Complete words starting with the prefix.
+
+        Raises:
+            TypeError: If prefix or after is not a string.
+            ValueError: If prefix or after contains non-lowercase letters, or
+                limit is negative.
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Prefix must be a string")
+        for char in prefix:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Prefix must contain only lowercase letters a-z")
+        if after is not None:
+            if not isinstance(after, str):
+                raise TypeError("After must be a string")
+            for char in after:
+                if not ('a' <= char <= 'z'):
+                    raise ValueError(
+                        "After must contain only lowercase letters a-z")
+        if limit is not None and limit < 0:
+            raise ValueError("Limit cannot be negative")
+
+        if after is not None and not after.startswith(prefix):
+            if after > prefix:
+                return  # Every word with this prefix sorts before the cursor
+            after = None  # Every word with this prefix sorts after it
+
+        curr = self.root
+        for char in prefix:
+            curr = curr.children[ord(char) - ord('a')]
+            if not curr:
+                return  # Prefix not found
+
+        words = self._iter_subtree(curr, prefix, after)
+        for word, _ in islice(words, limit):
+            yield word
+
+    def count_words(self) -> int:
+        """
+        Count the total number of complete words in the Trie.
+
+        Every node keeps the number of words in its subtree, so this is
+        read straight from the root.
+
+        Returns:
+            int: Number of words in the Trie.
+        """
+        return self.root.count
+
+    def count_prefix(self, prefix: str) -> int:
+        """
+        Count the words that start with the given prefix.
+
+        Args:
+            prefix: The prefix to count; the empty prefix counts every word.
+
+        Returns:
+            int: Number of words starting with prefix.
+
+        Raises:
+            TypeError: If prefix is not a string.
+            ValueError: If prefix contains non-lowercase letters.
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Prefix must be a string")
+        for char in prefix:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Prefix must contain only lowercase letters a-z")
+
+        curr = self.root
+        for char in prefix:
+            curr = curr.children[ord(char) - ord('a')]
+            if not curr:
+                return 0
+        return curr.count
+
+    def rank(self, word: str) -> int:
+        """
+        Count the words that sort strictly before word.
+
+        word itself does not need to be in the Trie. Walking its path, every
+        word ending at a proper prefix of word and every word below a
+        smaller sibling sorts before it.
+
+        Args:
+            word: The word to rank.
+
+        Returns:
+            int: Number of words in the Trie that are less than word.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+
+        rank = 0
+        curr = self.root
+        for char in word:
+            index = ord(char) - ord('a')
+            rank += curr.is_end_of_word + sum(
+                child.count for child in curr.children[:index] if child)
+            curr = curr.children[index]
+            if not curr:
+                break
+        return rank
+
+    def save(self, path: str) -> None:
+        """
+        Write the Trie to path as a LOUDS succinct bit-vector encoding.
+
+        Nodes are numbered in breadth-first order. Each node contributes one
+        1 bit per child followed by a 0 bit, with the children's labels and
+        end-of-word flags stored alongside. The file can then be queried in
+        place with open_mmap. Weights are not stored.
+
+        Args:
+            path: File to write.
+        """
+        labels = bytearray(1)  # The root has no label
+        terminal = [self.root.is_end_of_word]
+        degrees = []
+        queue = [self.root]
+        for node in queue:  # The queue grows while it is being read
+            degree = 0
+            for index, child in enumerate(node.children):
+                if child:
+                    queue.append(child)
+                    labels.append(index + ord('a'))
+                    terminal.append(child.is_end_of_word)
+                    degree += 1
+            degrees.append(degree)
+        del queue
+
+        node_count = len(labels)
+        bit_count = 2 * node_count + 1  # "10" for the super-root, then 1^d 0
+        louds = array('Q', bytes(8 * ((bit_count + 63) // 64)))
+        louds[0] = 1
+        position = 2
+        for degree in degrees:
+            for bit in range(position, position + degree):
+                louds[bit >> 6] |= 1 << (bit & 63)
+            position += degree + 1
+
+        # zeros[w] = number of 0 bits before word w, for select0
+        zeros = array('I', [0])
+        for word in louds:
+            zeros.append(zeros[-1] + 64 - word.bit_count())
+        ends = array('Q', bytes(8 * ((node_count + 63) // 64)))
+        for node_id, is_end in enumerate(terminal):
+            if is_end:
+                ends[node_id >> 6] |= 1 << (node_id & 63)
+
+        with open(path, "wb") as f:
+            f.write(_LOUDS_HEADER.pack(_LOUDS_MAGIC, node_count, bit_count,
+                                       len(louds), sum(terminal)))
+            for section in (louds.tobytes(), zeros.tobytes(), ends.tobytes(),
+                            bytes(labels)):
+                f.write(section)
+                f.write(bytes(-len(section) % 8))  # Keep sections aligned
+
+    @staticmethod
+    def open_mmap(path: str) -> "MappedTrie":
+        """
+        Open a file written by save for zero-copy, read-only queries.
+
+        Args:
+            path: File written by save.
+
+        Returns:
+            MappedTrie: A Trie view backed by a shared memory map of path.
+        """
+        return MappedTrie(path)
+
+    def print_trie(self, node=None, prefix="", level=0):
+        if node is None:
+            node = self.root
+        print("  " * level + prefix + ("$" if node.is_end_of_word else ""))
+        for i in range(26):
+            if node.children[i]:
+                char = chr(i + ord('a'))
+                self.print_trie(node.children[i], char, level + 1)
+
+
+ArrayTrie = Trie
+
+
+class TrieSnapshot(ArrayTrie):
+    """A read-only view of one published version of a ConcurrentTrie."""
+
+    def __init__(self, root: TrieNode, shared: bool, top_k: int = None):
+        self.root = root
+        self.top_k = top_k
+        self._shared = shared
+
+    def _read_only(self, *args, **kwargs) -> None:
+        raise TypeError("Trie snapshots are read-only")
+
+    insert_word = insert_many = remove_word = _read_only
+
+
+class ConcurrentTrie(ArrayTrie):
+    """
+    A Trie for many concurrent readers and one writer at a time.
+
+    Published nodes are never modified. A write copies the nodes on the
+    paths it touches (path copying), changes the copies, and then publishes
+    the new root with a single attribute assignment, which is atomic. Reads
+    load self.root once, so every read sees one complete version without
+    taking a lock, and snapshot() pins a version across several reads.
+    """
+
+    def __init__(self, top_k: int = None):
+        super().__init__(top_k)
+        self._write_lock = threading.Lock()  # Serializes writers only
+
+    def snapshot(self) -> TrieSnapshot:
+        """
+        Return a read-only view of the current version.
+
+        Returns:
+            TrieSnapshot: A Trie that later writes do not affect.
+        """
+        return TrieSnapshot(self.root, self._shared, self.top_k)
+
+    def enable_bloom_filter(self, *args, **kwargs) -> None:
+        """
+        Not supported: lock-free readers could see a word before its bits.
+
+        Raises:
+            TypeError: Always.
+        """
+        raise TypeError("Concurrent Tries do not support Bloom filters")
+
+    @staticmethod
+    def _copy_node(node: TrieNode, fresh: set) -> TrieNode:
+        """Return an unpublished copy of node and record it in fresh."""
+        copy = ArrayTrieNode()
+        copy.children = node.children[:]
+        copy.is_end_of_word = node.is_end_of_word
+        copy.weight = node.weight
+        copy.top = None if node.top is None else node.top[:]
+        copy.count = node.count
+        fresh.add(id(copy))
+        return copy
+
+    def _private_path(self, root: TrieNode, indices: bytes, fresh: set,
+                      create: bool) -> list:
+        """
+        Return the path for indices under root, copying published nodes.
+
+        Args:
+            root: Unpublished root of the version being written.
+            indices: Child indices of the word.
+            fresh: Ids of nodes created by this write, safe to modify.
+            create: Whether to add missing nodes (for inserts).
+
+        Returns:
+            list: Writable nodes from root down the word's path.
+        """
+        curr = root
+        path = [curr]
+        for index in indices:
+            child = curr.children[index]
+            if child is None:
+                if not create:
+                    break
+                child = ArrayTrieNode()
+                fresh.add(id(child))
+            elif id(child) not in fresh:
+                child = self._copy_node(child, fresh)
+            curr.children[index] = child
+            curr = child
+            path.append(curr)
+        return path
+
+    def _insert_private(self, root: TrieNode, word: str, indices: bytes,
+                        weight: float, fresh: set) -> None:
+        """Insert word into the unpublished version rooted at root."""
+        path = self._private_path(root, indices, fresh, create=True)
+        curr = path[-1]
+        old = (-curr.weight, word) if curr.is_end_of_word else None
+        curr.is_end_of_word = True
+        curr.weight = weight
+        self._refresh_path(path, word, old)
+
+    def insert_word(self, word: str, weight: float = 1) -> None:
+        """
+        Insert a word and publish the new version.
+
+        Args:
+            word: The word to insert.
+            weight: How strongly autocomplete(prefix, k) should prefer it.
+
+        Raises:
+            TypeError: If word is not a string or weight is not a number.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        self.insert_many([word], weight)
+
+    def insert_many(self, words, weight: float = 1) -> None:
+        """
+        Insert many words and publish them together as one new version.
+
+        Args:
+            words: Iterable of words to insert.
+            weight: Weight given to every inserted word.
+
+        Raises:
+            TypeError: If a word is not a string or weight is not a number.
+            ValueError: If a word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(weight, (int, float)):
+            raise TypeError("Weight must be a number")
+        words = list(words)
+        all_indices = _batch_child_indices(words)
+
+        with self._write_lock:
+            fresh = set()
+            root = self._copy_node(self.root, fresh)
+            start = 0
+            for word in words:
+                end = start + len(word)
+                self._insert_private(root, word, all_indices[start:end],
+                                     weight, fresh)
+                start = end
+            self.root = root  # Publish
+
+    def remove_word(self, word: str) -> None:
+        """
+        Remove a word and publish the new version.
+
+        Args:
+            word: The word to remove.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        indices = _batch_child_indices([word])
+
+        with self._write_lock:
+            curr = self.root
+            for index in indices:
+                curr = curr.children[index]
+                if not curr:
+                    return  # Word not found
+            if not curr.is_end_of_word:
+                return  # Word not found
+            old = (-curr.weight, word)
+
+            fresh = set()
+            root = self._copy_node(self.root, fresh)
+            path = self._private_path(root, indices, fresh, create=False)
+            path[-1].is_end_of_word = False
+            path[-1].weight = 0
+            # Prune nodes that no longer lead to any word
+            while len(path) > 1:
+                node = path[-1]
+                if node.is_end_of_word or any(node.children):
+                    break
+                path.pop()
+                path[-1].children[indices[len(path) - 1]] = None
+            self._refresh_path(path, word, old)
+            self.root = root  # Publish
+
+
+_LOUDS_MAGIC = b"LOUDSv1\0"
+# magic, node count, LOUDS bit count, LOUDS word count, word count
+_LOUDS_HEADER = struct.Struct("<8sIIII")
+
+
+class MappedTrie:
+    """
+    Read-only Trie queried directly from a memory-mapped file.
+
+    The file written by Trie.save is never unpacked: lookups navigate the
+    LOUDS bits with rank/select over the mapped pages, so processes that open
+    the same file share one copy in the page cache.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map the file at path.
+
+        Args:
+            path: File written by Trie.save.
+
+        Raises:
+            ValueError: If the file is not a saved Trie.
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, nodes, bits, louds_words, words = _LOUDS_HEADER.unpack_from(
+            self._mmap)
+        if magic != _LOUDS_MAGIC:
+            self._mmap.close()
+            raise ValueError("File is not a saved Trie")
+        self._node_count = nodes
+        self._bit_count = bits
+        self._word_count = words
+
+        def _section(start: int, size: int) -> tuple[int, int]:
+            """Return (start, end) of a section and where the next one starts."""
+            return start + size, start + size + (-size % 8)
+
+        view = memoryview(self._mmap)
+        start = _LOUDS_HEADER.size
+        end, nxt = _section(start, 8 * louds_words)
+        self._louds = view[start:end].cast('Q')
+        start = nxt
+        end, nxt = _section(start, 4 * (louds_words + 1))
+        self._zeros = view[start:end].cast('I')
+        start = nxt
+        end, nxt = _section(start, 8 * ((nodes + 63) // 64))
+        self._ends = view[start:end].cast('Q')
+        self._labels = nxt  # Labels are searched with mmap.find in place
+        view.release()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        for view in (self._louds, self._zeros, self._ends):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedTrie":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _select0(self, k: int) -> int:
+        """
+        Return the position of the k-th 0 bit (counting from 0).
+
+        The per-word zero counts act as a rank directory: a binary search
+        finds the word holding the bit, then the word is scanned.
+        """
+        word_index = bisect.bisect_right(
+            self._zeros, k, 0, len(self._louds)) - 1
+        zeros = ~self._louds[word_index] & 0xFFFFFFFFFFFFFFFF
+        for _ in range(k - self._zeros[word_index]):
+            zeros &= zeros - 1  # Drop the lowest 0 bit
+        return (word_index << 6) + (zeros & -zeros).bit_length() - 1
+
+    def _next_zero(self, position: int) -> int:
+        """Return the position of the first 0 bit at or after position."""
+        word_index = position >> 6
+        zeros = (~self._louds[word_index] & 0xFFFFFFFFFFFFFFFF) >> (position & 63)
+        while not zeros:
+            word_index += 1
+            position = word_index << 6
+            zeros = ~self._louds[word_index] & 0xFFFFFFFFFFFFFFFF
+        return position + (zeros & -zeros).bit_length() - 1
+
+    def _children(self, node: int) -> tuple[int, int]:
+        """
+        Return the id range of node's children.
+
+        Node i's child list is the run of 1 bits after the i-th 0 bit, and
+        the j-th 1 bit overall is node j, so no rank query is needed.
+
+        Args:
+            node: Node id in breadth-first order.
+
+        Returns:
+            tuple[int, int]: (first child id, one past the last child id).
+        """
+        start = self._select0(node) + 1
+        first = start - node - 1  # Ones before start: start minus node + 1 zeros
+        return first, first + self._next_zero(start) - start
+
+    def _child(self, node: int, char: str) -> int:
+        """Return the id of node's child labelled char, or -1."""
+        first, last = self._children(node)
+        found = self._mmap.find(char.encode(), self._labels + first,
+                                self._labels + last)
+        return found - self._labels if found >= 0 else -1
+
+    def _is_end(self, node: int) -> bool:
+        return bool(self._ends[node >> 6] >> (node & 63) & 1)
+
+    def contains_word(self, word: str) -> bool:
+        """
+        Check if a word exists in the Trie and is marked as complete.
+
+        Args:
+            word: The word to check.
+
+        Returns:
+            bool: True if the word is complete, False otherwise.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty or contains non-lowercase letters.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            raise ValueError("Word cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Word must contain only lowercase letters a-z")
+
+        node = 0
+        for char in word:
+            node = self._child(node, char)
+            if node < 0:
+                return False
+        return self._is_end(node)
+
+    def autocomplete(self, prefix: str) -> list[str]:
+        """
+        Return a list of words in the Trie that start with the given prefix.
+
+        Args:
+            prefix: The prefix to search for.
+
+        Returns:
+            list[str]: List of complete words starting with the prefix.
+
+        Raises:
+            TypeError: If prefix is not a string.
+            ValueError: If prefix contains non-lowercase letters.
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Prefix must be a string")
+        for char in prefix:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    "Prefix must contain only lowercase letters a-z")
+
+        node = 0
+        for char in prefix:
+            node = self._child(node, char)
+            if node < 0:
+                return []  # Prefix not found
+
+        words = [prefix] if self._is_end(node) else []
+        buffer = list(prefix)
+        # Stack of [next child id, one past the last child id]
+        stack = [list(self._children(node))]
+        while stack:
+            child_range = stack[-1]
+            child, last = child_range
+            if child == last:
+                stack.pop()
+                if stack:
+                    buffer.pop()
+                continue
+            child_range[0] = child + 1
+            buffer.append(chr(self._mmap[self._labels + child]))
+            if self._is_end(child):
+                words.append("".join(buffer))
+            stack.append(list(self._children(child)))
+        return words
+
+    def count_words(self) -> int:
+        """
+        Count the total number of complete words in the Trie.
+
+        Returns:
+            int: Number of words in the Trie.
+        """
+        return self._word_count
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton that finds every Trie word occurring in a text.
+
+    The Trie is copied into numbered states. A state's failure link points
+    to the state of its longest proper suffix that is also a prefix of some
+    word, and its outputs are its own word plus the outputs of its failure
+    state. Both are filled in breadth first, so missing transitions can be
+    resolved ahead of time through the (shallower) failure state, and
+    scanning is then one table lookup per character.
+
+    States are stored premultiplied by the row width, so state s, code c
+    moves to delta[s + c]. Code 26 stands for any character that is not
+    'a'-'z' and always leads back to the root.
+    """
+
+    _WIDTH = 27  # 26 letters plus the "no letter" code
+
+    def __init__(self, trie: ArrayTrie):
+        """
+        Compile the automaton for the words in trie.
+
+        Later changes to trie are not reflected in the automaton.
 
+        Args:
+            trie: The keyword dictionary.
+
+        Raises:
+            TypeError: If trie is not an array-based Trie.
+        """
+        if not isinstance(trie, ArrayTrie):
+            raise TypeError("Expected an array-based Trie")
+        width = self._WIDTH
+        delta = [0] * width
+        outputs = [None] * width
+        queue = deque()
+
+        # A DAWG node can be reached through several prefixes, so states
+        # are made per path and never per node
+        for code, child in enumerate(trie.root.children):
+            if child:
+                state = len(delta)
+                delta.extend([0] * width)
+                outputs.extend([None] * width)
+                delta[code] = state
+                queue.append((child, state, chr(97 + code), 0))
+
+        while queue:
+            node, state, prefix, fail = queue.popleft()
+            own = (prefix,) if node.is_end_of_word else ()
+            outputs[state] = own + (outputs[fail] or ()) or None
+            for code, child in enumerate(node.children):
+                if child:
+                    next_state = len(delta)
+                    delta.extend([0] * width)
+                    outputs.extend([None] * width)
+                    delta[state + code] = next_state
+                    queue.append((child, next_state, prefix + chr(97 + code),
+                                  delta[fail + code]))
+                else:
+                    delta[state + code] = delta[fail + code]
+
+        self._delta = delta
+        self._outputs = outputs
+        self.state_count = len(delta) // width
+
+    def scan(self, text_or_chunks):
+        """
+        Yield every occurrence of a Trie word in a text, in one pass.
+
+        The text can be given as one string or as an iterable of chunks
+        (for example a file read piece by piece). The automaton state is
+        carried from one chunk to the next, so a word split across a chunk
+        boundary is still found. Matching is case-sensitive.
+
+        Args:
+            text_or_chunks: A string, or an iterable of strings.
+
+        Yields:
+            tuple[int, str]: (offset, word) for each match, where offset is
+                the index of the match's first character in the whole text.
+                Matches are ordered by end position, longest first.
+
+        Raises:
+            TypeError: If the text or a chunk is not a string.
+        """
+        if isinstance(text_or_chunks, str):
+            text_or_chunks = (text_or_chunks,)
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        offset = 0
+        for chunk in text_or_chunks:
+            if not isinstance(chunk, str):
+                raise TypeError("Text must be a string")
+            # One code per character; anything outside ASCII becomes '?'
+            codes = chunk.encode("ascii", "replace").translate(_SCAN_CODE)
+            for end, code in enumerate(codes, offset + 1):
+                state = delta[state + code]
+                matched = outputs[state]
+                if matched:
+                    for word in matched:
+                        yield end - len(word), word
+            offset += len(chunk)
+
+
+class DoubleArrayTrie:
+    """
+    A Trie over a-z stored in flat integer buffers (a double array).
+
+    State s has a child for code c (0 for 'a' ... 25 for 'z') at slot
+    t = base[s] + c exactly when check[t] == s. All states live in array('i')
+    buffers, so there is no per-node Python object or 26-slot list. Unused
+    slots have a negative check and are chained into a doubly linked free
+    list through their own base/check entries, so no extra memory is needed
+    to find room for new states. The free list only holds holes below the
+    highest used slot; children that fit none of them go right after it,
+    and the buffers grow by half when that runs past the end.
+    """
+
+    _ROOT = 0  # The root state always lives in slot 0
+    _MAX_PROBES = 64  # Holes tried before placing children after the last used slot
 
-class Trie:
     def __init__(self):
-        self.root = TrieNode()  # Initialize root node
+        """Initialize the double array with just the root state."""
+        self._base = array('i', [0])
+        self._check = array('i', [0])
+        self._is_end = array('b', [0])
+        self._free_head = 0  # 0 means the free list is empty
+        self._free_cursor = 0  # Where the next search for room starts
+        self._used_end = 1  # Every slot from here on is free
+        self._state_count = 1
+        self._word_count = 0
+
+    @staticmethod
+    def _validate(word, name: str = "Word", allow_empty: bool = False) -> None:
+        """
+        Validate a word or prefix the same way the array-based Trie does.
+
+        Args:
+            word: The value to check.
+            name: "Word" or "Prefix", used in the error messages.
+            allow_empty: Whether the empty string is accepted.
+
+        Raises:
+            TypeError: If word is not a string.
+            ValueError: If word is empty (when not allowed) or contains
+                non-lowercase letters.
+        """
+        if not isinstance(word, str):
+            raise TypeError(f"{name} must be a string")
+        if not word and not allow_empty:
+            raise ValueError(f"{name} cannot be empty")
+        for char in word:
+            if not ('a' <= char <= 'z'):
+                raise ValueError(
+                    f"{name} must contain only lowercase letters a-z")
+
+    def _link(self, slot: int) -> None:
+        """Push slot onto the front of the free list."""
+        head = self._free_head
+        self._check[slot] = -head - 1  # Next free slot, 0 ends the list
+        self._base[slot] = -1  # Previous free slot, 0 means none
+        if head:
+            self._base[head] = -slot - 1
+        self._free_head = slot
+
+    def _unlink(self, slot: int) -> None:
+        """Take slot out of the free list."""
+        nxt = -self._check[slot] - 1
+        prev = -self._base[slot] - 1
+        if prev:
+            self._check[prev] = -nxt - 1
+        else:
+            self._free_head = nxt
+        if nxt:
+            self._base[nxt] = -prev - 1
+        if slot == self._free_cursor:
+            self._free_cursor = nxt
+
+    def _grow(self, size: int) -> None:
+        """Extend the buffers so that slot size - 1 exists."""
+        current = len(self._check)
+        if size <= current:
+            return
+        added = max(size, current + current // 2) - current
+        # New slots are past _used_end, so they stay off the free list
+        self._check.extend(array('i', [-1]) * added)
+        self._base.extend(array('i', bytes(4 * added)))
+        self._is_end.extend(bytes(added))
+
+    def _child(self, state: int, code: int) -> int:
+        """Return the slot of state's child for code, or -1 if it is absent."""
+        base = self._base[state]
+        if base <= 0:
+            return -1
+        slot = base + code
+        if slot < len(self._check) and self._check[slot] == state:
+            return slot
+        return -1
+
+    def _child_codes(self, state: int) -> list[int]:
+        """Return the codes (0-25) of all children of state, in order."""
+        base = self._base[state]
+        if base <= 0:
+            return []
+        check = self._check
+        limit = len(check)
+        return [code for code in range(26)
+                if base + code < limit and check[base + code] == state]
+
+    def _find_base(self, codes: list[int]) -> int:
+        """
+        Find a base >= 1 for which every base + code slot is free.
+
+        Args:
+            codes: Sorted child codes that must all fit.
+
+        Returns:
+            int: A usable base value.
+        """
+        check = self._check
+        first, last = codes[0], codes[-1]
+        limit = len(check)  # Slots past the end count as free
+        # Next-fit: resume where the last search stopped so that slots which
+        # keep failing do not get probed over and over
+        slot = self._free_cursor or self._free_head
+        rest = codes[1:]  # The probed slot itself is free
+        for _ in range(self._MAX_PROBES):
+            if not slot:
+                break  # Free list is empty
+            base = slot - first
+            if base >= 1:
+                for code in rest:
+                    if base + code < limit and check[base + code] >= 0:
+                        break
+                else:
+                    self._free_cursor = slot
+                    self._grow(base + last + 1)
+                    return base
+            slot = -check[slot] - 1 or self._free_head
+        # No hole fits: place the children after the last used slot
+        base = max(self._used_end - first, 1)
+        self._grow(base + last + 1)
+        return base
+
+    def _claim(self, slot: int, parent: int) -> None:
+        """Mark free slot as used by a fresh child of parent."""
+        if slot < self._used_end:
+            self._unlink(slot)
+        else:
+            # Slots skipped on the way become holes
+            for hole in range(self._used_end, slot):
+                self._link(hole)
+            self._used_end = slot + 1
+        self._check[slot] = parent
+        self._base[slot] = 0
+        self._is_end[slot] = 0
+        self._state_count += 1
+
+    def _release(self, slot: int) -> None:
+        """Return slot to the free list."""
+        self._is_end[slot] = 0
+        self._state_count -= 1
+        self._link(slot)
+
+    def _relocate(self, state: int, new_code: int) -> None:
+        """
+        Move all children of state to a base that also has room for new_code.
+
+        Args:
+            state: The state whose children collide with another state.
+            new_code: The code of the child about to be added.
+        """
+        old_base = self._base[state]
+        codes = self._child_codes(state)
+        new_base = self._find_base(sorted(codes + [new_code]))
+        for code in codes:
+            old_slot = old_base + code
+            new_slot = new_base + code
+            self._claim(new_slot, state)
+            self._base[new_slot] = self._base[old_slot]
+            self._is_end[new_slot] = self._is_end[old_slot]
+            # Grandchildren must now point at the child's new slot
+            for grand_code in self._child_codes(old_slot):
+                self._check[self._base[old_slot] + grand_code] = new_slot
+            self._release(old_slot)
+        self._base[state] = new_base
+
+    def _add_child(self, state: int, code: int) -> int:
+        """
+        Create a child of state for code and return its slot.
+
+        Args:
+            state: Parent state.
+            code: Character code (0-25) of the new child.
+
+        Returns:
+            int: Slot of the new child.
+        """
+        if not self._base[state]:
+            self._base[state] = self._find_base([code])
+        else:
+            slot = self._base[state] + code
+            self._grow(slot + 1)
+            if self._check[slot] >= 0:
+                self._relocate(state, code)
+        slot = self._base[state] + code
+        self._claim(slot, state)
+        return slot
+
+    def _walk(self, word: str) -> int:
+        """Return the state reached by following word, or -1."""
+        state = self._ROOT
+        for char in word:
+            state = self._child(state, ord(char) - 97)  # 'a' -> 0
+            if state < 0:
+                return -1
+        return state
 
     def insert_word(self, word: str) -> None:
         """
@@ -19,22 +1810,18 @@ class Trie:
             TypeError: If word is not a string.
             ValueError: If word is empty or contains non-lowercase letters.
         """
-        if not isinstance(word, str):
-            raise TypeError("Word must be a string")
-        if not word:
-            raise ValueError("Word cannot be empty")
-        for char in word:
-            if not ('a' <= char <= 'z'):
-                raise ValueError(
-                    "Word must contain only lowercase letters a-z")
+        self._validate(word)
 
-        curr = self.root
+        state = self._ROOT
         for char in word:
-            index = ord(char) - ord('a')  # Map 'a' to 0, 'b' to 1, etc.
-            if not curr.children[index]:
-                curr.children[index] = TrieNode()
-            curr = curr.children[index]
-        curr.is_end_of_word = True
+            code = ord(char) - 97
+            child = self._child(state, code)
+            if child < 0:
+                child = self._add_child(state, code)
+            state = child
+        if not self._is_end[state]:
+            self._is_end[state] = 1
+            self._word_count += 1
 
     def contains_word(self, word: str) -> bool:
         """
@@ -50,26 +1837,13 @@ class Trie:
             TypeError: If word is not a string.
             ValueError: If word is empty or contains non-lowercase letters.
         """
-        if not isinstance(word, str):
-            raise TypeError("Word must be a string")
-        if not word:
-            raise ValueError("Word cannot be empty")
-        for char in word:
-            if not ('a' <= char <= 'z'):
-                raise ValueError(
-                    "Word must contain only lowercase letters a-z")
-
-        curr = self.root
-        for char in word:
-            index = ord(char) - ord('a')  # Map 'a' to 0, 'b' to 1, etc.
-            if not curr.children[index]:
-                return False
-            curr = curr.children[index]
-        return curr.is_end_of_word
+        self._validate(word)
+        state = self._walk(word)
+        return state >= 0 and bool(self._is_end[state])
 
     def remove_word(self, word: str) -> None:
         """
-        Remove a word from the Trie using recursion.
+        Remove a word from the Trie and free the slots it no longer needs.
 
         Args:
             word: The word to remove.
@@ -78,54 +1852,27 @@ class Trie:
             TypeError: If word is not a string.
             ValueError: If word is empty or contains non-lowercase letters.
         """
-        def _remove_recursive(node: TrieNode, word: str, index: int) -> bool:
-            """
-            Helper method to recursively remove a word.
-
-            Args:
-                node: Current node in the Trie.
-                word: The word being removed.
-                index: Current character index in the word.
-
-            Returns:
-                bool: True if the current node can be deleted, False otherwise.
-            """
-            # Base case: reached the end of the word
-            if index == len(word):
-                if not node.is_end_of_word:
-                    return False  # Word not found
-                node.is_end_of_word = False  # Unmark as end of word
-                # Return True if node has no children and is not end of another word
-                return not any(node.children)
-
-            char = word[index]
-            char_index = ord(char) - ord('a')
-            if not node.children[char_index]:
-                return False  # Word not found
-
-            # Recursively remove the next character
-            should_delete_child = _remove_recursive(
-                node.children[char_index], word, index + 1)
-
-            # If child can be deleted, remove it
-            if should_delete_child:
-                node.children[char_index] = None
-                # Return True if current node has no children and is not end of a word
-                return not any(node.children) and not node.is_end_of_word
-
-            # Node cannot be deleted (has other children or is end of a word)
-            return False
+        self._validate(word)
 
-        if not isinstance(word, str):
-            raise TypeError("Word must be a string")
-        if not word:
-            raise ValueError("Word cannot be empty")
+        path = [self._ROOT]
         for char in word:
-            if not ('a' <= char <= 'z'):
-                raise ValueError(
-                    "Word must contain only lowercase letters a-z")
-
-        _remove_recursive(self.root, word, 0)
+            state = self._child(path[-1], ord(char) - 97)
+            if state < 0:
+                return  # Word not found
+            path.append(state)
+        if not self._is_end[path[-1]]:
+            return  # Word not found
+        self._is_end[path[-1]] = 0
+        self._word_count -= 1
+
+        # Free states bottom-up while they hold no word and have no children
+        for state in reversed(path[1:]):
+            if self._is_end[state] or self._child_codes(state):
+                break
+            self._release(state)
+        for state in path:
+            if self._check[state] >= 0 and not self._child_codes(state):
+                self._base[state] = 0
 
     def autocomplete(self, prefix: str) -> list[str]:
         """
@@ -141,42 +1888,29 @@ class Trie:
             TypeError: If prefix is not a string.
             ValueError: If prefix contains non-lowercase letters.
         """
-        def _collect_words(node: TrieNode, current_word: str, words: list) -> None:
+        def _collect_words(state: int, current_word: str, words: list) -> None:
             """
-            Helper method to recursively collect all words from a given node.
+            Helper method to recursively collect all words from a given state.
 
             Args:
-                node: Current node in the Trie.
+                state: Current state in the double array.
                 current_word: The word built so far.
                 words: List to store collected words.
             """
-            if node.is_end_of_word:
+            if self._is_end[state]:
                 words.append(current_word)
+            for code in self._child_codes(state):
+                _collect_words(self._base[state] + code,
+                               current_word + chr(code + 97), words)
 
-            for i in range(26):
-                if node.children[i]:
-                    char = chr(i + ord('a'))
-                    _collect_words(
-                        node.children[i], current_word + char, words)
-
-        if not isinstance(prefix, str):
-            raise TypeError("Prefix must be a string")
-        for char in prefix:
-            if not ('a' <= char <= 'z'):
-                raise ValueError(
-                    "Prefix must contain only lowercase letters a-z")
+        self._validate(prefix, "Prefix", allow_empty=True)
 
-        # Traverse to the node corresponding to the prefix
-        curr = self.root
-        for char in prefix:
-            index = ord(char) - ord('a')
-            if not curr.children[index]:
-                return []  # Prefix not found
-            curr = curr.children[index]
+        state = self._walk(prefix)
+        if state < 0:
+            return []  # Prefix not found
 
-        # Collect all words starting from the prefix's node
         words = []
-        _collect_words(curr, prefix, words)
+        _collect_words(state, prefix, words)
         return words
 
     def count_words(self) -> int:
@@ -186,32 +1920,458 @@ class Trie:
         Returns:
             int: Number of words in the Trie.
         """
-        def _count_recursive(node: TrieNode) -> int:
-            """
-            Helper method to recursively count words.
-
-            Args:
-                node: Current node in the Trie.
-
-            Returns:
-                int: Number of complete words in the subtree rooted at node.
-            """
-            count = 1 if node.is_end_of_word else 0
-            for i in range(26):
-                if node.children[i]:
-                    count += _count_recursive(node.children[i])
-            return count
-
-        return _count_recursive(self.root)
-
-    def print_trie(self, node=None, prefix="", level=0):
-        if node is None:
-            node = self.root
-        print("  " * level + prefix + ("$" if node.is_end_of_word else ""))
-        for i in range(26):
-            if node.children[i]:
-                char = chr(i + ord('a'))
-                self.print_trie(node.children[i], char, level + 1)
+        return self._word_count
+
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the base/check/end buffers."""
+        return sum(buf.itemsize * len(buf)
+                   for buf in (self._base, self._check, self._is_end))
+
+    def occupancy(self) -> float:
+        """Return the fraction of buffer slots that hold a state."""
+        return self._state_count / len(self._check)
+
+
+def _random_words(count: int, seed: int = 0) -> list[str]:
+    """Return count random lowercase words of length 3-12."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 12)))
+            for _ in range(count)]
+
+
+def compare_trie_backends(word_count: int = 20000, probe_count: int = 20000) -> None:
+    """
+    Print memory use and lookup latency of ArrayTrie vs DoubleArrayTrie.
+
+    Args:
+        word_count: Number of random words to insert.
+        probe_count: Number of contains_word lookups (about half are misses).
+    """
+    words = _random_words(word_count)
+    probes = words[:probe_count // 2] + _random_words(probe_count // 2, seed=1)
+
+    for name, backend in (("ArrayTrie", ArrayTrie),
+                          ("DoubleArrayTrie", DoubleArrayTrie)):
+        start = time.perf_counter()
+        trie = backend()
+        for word in words:
+            trie.insert_word(word)
+        build_time = time.perf_counter() - start
+
+        if hasattr(trie, "nbytes"):
+            memory = trie.nbytes()
+        else:
+            # Node objects are scattered, so trace a second build instead
+            tracemalloc.start()
+            traced = backend()
+            for word in words:
+                traced.insert_word(word)
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del traced
+
+        start = time.perf_counter()
+        for word in probes:
+            trie.contains_word(word)
+        lookup_time = time.perf_counter() - start
+
+        occupancy = ""
+        if hasattr(trie, "occupancy"):
+            occupancy = f" ({trie.occupancy():.0%} of slots used)"
+        print(f"{name:>16}: {memory / 1024 / 1024:8.2f} MiB{occupancy}, "
+              f"build {build_time:.3f}s, "
+              f"{lookup_time / len(probes) * 1e6:.2f} us/lookup")
+
+
+def _count_nodes(trie: ArrayTrie) -> int:
+    """Return the number of distinct nodes reachable from trie's root."""
+    seen = {id(trie.root)}
+    stack = [trie.root]
+    while stack:
+        node = stack.pop()
+        for child in node.children:
+            if child and id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return len(seen)
+
+
+def compare_top_k_latency(word_count: int = 50000, k: int = 10) -> None:
+    """
+    Print p50/p99 latency of cached top-k autocomplete vs a full subtree scan.
+
+    Args:
+        word_count: Number of random weighted words to insert.
+        k: Number of completions requested per query.
+    """
+    rng = random.Random(3)
+    trie = ArrayTrie(top_k=k)
+    for word in _random_words(word_count):
+        trie.insert_word(word, rng.randint(1, 1000))
+    prefixes = [chr(ord('a') + i) for i in range(26)]
+    prefixes += [word[:2] for word in _random_words(200, seed=4)]
+
+    for name, query in (("full scan", lambda prefix: trie.autocomplete(prefix)[:k]),
+                        ("cached top-k", lambda prefix: trie.autocomplete(prefix, k))):
+        latencies = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            query(prefix)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{name:>12}: p50 {p50 * 1e6:9.1f} us, p99 {p99 * 1e6:9.1f} us")
+
+
+def compare_mmap_startup(word_count: int = 50000, probe_count: int = 20000) -> None:
+    """
+    Print startup time and lookup latency of rebuilding vs open_mmap.
+
+    Args:
+        word_count: Number of random words in the dictionary.
+        probe_count: Number of contains_word lookups (about half are misses).
+    """
+    words = _random_words(word_count)
+    probes = words[:probe_count // 2] + _random_words(probe_count // 2, seed=1)
+    path = os.path.join(tempfile.mkdtemp(), "words.louds")
+    trie = ArrayTrie()
+    for word in words:
+        trie.insert_word(word)
+    trie.save(path)
+    print(f"File size: {os.path.getsize(path) / 1024 / 1024:.2f} MiB")
+
+    def _rebuild() -> ArrayTrie:
+        rebuilt = ArrayTrie()
+        for word in words:
+            rebuilt.insert_word(word)
+        return rebuilt
+
+    for name, startup in (("rebuild", _rebuild),
+                          ("open_mmap", lambda: ArrayTrie.open_mmap(path))):
+        start = time.perf_counter()
+        loaded = startup()
+        startup_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for word in probes:
+            loaded.contains_word(word)
+        lookup_time = time.perf_counter() - start
+
+        print(f"{name:>10}: startup {startup_time * 1000:9.2f} ms, "
+              f"{lookup_time / len(probes) * 1e6:.2f} us/lookup")
+        if isinstance(loaded, MappedTrie):
+            loaded.close()
+        del loaded  # Free it now rather than inside the next timing
+    os.remove(path)
+
+
+def compare_batch_api(word_count: int = 50000, probe_count: int = 200000) -> None:
+    """
+    Print the time of per-word calls vs insert_many / contains_many.
+
+    Args:
+        word_count: Number of random words to insert.
+        probe_count: Number of tokens to check (about half are misses).
+    """
+    words = _random_words(word_count)
+    probes = (words * (probe_count // word_count // 2)
+              + _random_words(probe_count // 2, seed=1))
+    random.Random(2).shuffle(probes)
+
+    per_word = ArrayTrie()
+    start = time.perf_counter()
+    for word in words:
+        per_word.insert_word(word)
+    insert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for word in probes:
+        per_word.contains_word(word)
+    contains_time = time.perf_counter() - start
+    print(f" per word: insert {insert_time:.3f}s, contains {contains_time:.3f}s")
+
+    batched = ArrayTrie()
+    start = time.perf_counter()
+    batched.insert_many(words)
+    insert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched.contains_many(probes)
+    contains_time = time.perf_counter() - start
+    print(f"  batched: insert {insert_time:.3f}s, contains {contains_time:.3f}s")
+
+
+def _edit_variants(word: str) -> set[str]:
+    """Return every string one insert, delete or replace away from word."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = [left + right[1:] for left, right in splits if right]
+    replaces = [left + char + right[1:]
+                for left, right in splits if right for char in letters]
+    inserts = [left + char + right for left, right in splits for char in letters]
+    return set(deletes + replaces + inserts)
+
+
+def compare_fuzzy_search(word_count: int = 20000, query_count: int = 20,
+                         max_distance: int = 2) -> None:
+    """
+    Print the time of fuzzy_search vs probing every generated edit variant.
+
+    Args:
+        word_count: Number of random words in the dictionary.
+        query_count: Number of misspelled queries.
+        max_distance: Edit distance searched for.
+    """
+    words = _random_words(word_count)
+    trie = ArrayTrie()
+    trie.insert_many(words)
+    queries = _random_words(query_count, seed=5)
+
+    def _brute_force(query: str) -> set[str]:
+        variants = {query}
+        for _ in range(max_distance):
+            variants |= {edit for variant in variants
+                         for edit in _edit_variants(variant)}
+        return {variant for variant in variants
+                if variant and trie.contains_word(variant)}
+
+    start = time.perf_counter()
+    expected = [_brute_force(query) for query in queries]
+    brute_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [trie.fuzzy_search(query, max_distance) for query in queries]
+    fuzzy_time = time.perf_counter() - start
+
+    assert expected == [{match for match, _ in matches} for matches in found]
+    print(f"  variants: {brute_time / query_count * 1000:8.2f} ms/query")
+    print(f"     fuzzy: {fuzzy_time / query_count * 1000:8.2f} ms/query")
+
+
+def stress_test_concurrent_trie(reader_counts: tuple = (1, 2, 4),
+                                seconds: float = 0.5) -> None:
+    """
+    Run readers against a writer and check that no read sees a torn version.
+
+    The writer publishes groups of three words with insert_many and removes
+    single words. Every reader checks that each group is entirely present
+    or entirely absent, and that a snapshot's word count matches its word
+    list. Reader throughput is printed for each reader count.
+
+    Args:
+        reader_counts: Numbers of reader threads to try.
+        seconds: How long each run lasts.
+
+    Raises:
+        AssertionError: If any reader saw a partially applied write.
+    """
+    for reader_count in reader_counts:
+        trie = ConcurrentTrie()
+        base_words = [word for word in _random_words(500, seed=6)
+                      if not word.startswith("zz")]  # Keep "zz" for groups
+        trie.insert_many(base_words)
+        stop = threading.Event()
+        torn = []
+        reads = [0] * reader_count
+
+        def _writer() -> None:
+            rng = random.Random(7)
+            while not stop.is_set():
+                stem = "zz" + "".join(rng.choices("abcd", k=2))
+                trie.insert_many([stem + "a", stem + "b", stem + "c"],
+                                 rng.randint(1, 100))
+                word = rng.choice(base_words)
+                trie.remove_word(word)
+                trie.insert_word(word)
+
+        def _reader(slot: int) -> None:
+            while not stop.is_set():
+                snapshot = trie.snapshot()
+                words = snapshot.autocomplete("zz")
+                groups = {}
+                for word in words:
+                    groups[word[:-1]] = groups.get(word[:-1], 0) + 1
+                if any(count != 3 for count in groups.values()):
+                    torn.append(words)
+                if snapshot.count_words() != len(snapshot.autocomplete("")):
+                    torn.append("count")
+                reads[slot] += 1
+
+        threads = [threading.Thread(target=_writer)]
+        threads += [threading.Thread(target=_reader, args=(slot,))
+                    for slot in range(reader_count)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert not torn, f"Readers saw {len(torn)} torn versions"
+        print(f"{reader_count} readers: {sum(reads) / seconds:8.0f} reads/s, "
+              f"no torn reads")
+
+
+def compare_bulk_build(word_count: int = 50000) -> None:
+    """
+    Print build time, node count and memory of insert_word vs from_sorted.
+
+    Args:
+        word_count: Number of random words to load.
+    """
+    # Stems with common English endings, so there are suffixes to share
+    stems = _random_words(word_count // 5, seed=2)
+    endings = ("", "s", "ed", "ing", "er")
+    words = sorted({stem + ending for stem in stems for ending in endings})
+
+    def _insert_each() -> ArrayTrie:
+        trie = ArrayTrie()
+        for word in words:
+            trie.insert_word(word)
+        return trie
+
+    for name, build in (("insert_word", _insert_each),
+                        ("from_sorted", lambda: ArrayTrie.from_sorted(words))):
+        start = time.perf_counter()
+        trie = build()
+        build_time = time.perf_counter() - start
+
+        tracemalloc.start()
+        traced = build()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del traced
+
+        print(f"{name:>12}: build {build_time:.3f}s, "
+              f"{_count_nodes(trie)} nodes, {memory / 1024 / 1024:.2f} MiB")
+
+
+def compare_bloom_filter(word_count: int = 50000, probe_count: int = 200000,
+                         rates: tuple = (0.1, 0.01, 0.001)) -> None:
+    """
+    Print contains_word time with and without a Bloom filter in front.
+
+    Random misses leave the Trie after a couple of nodes, while near misses
+    (a word with its last letter changed) walk almost the whole path, which
+    is where the filter pays off.
+
+    Args:
+        word_count: Number of random words to insert.
+        probe_count: Number of lookups per run, 90% of them misses.
+        rates: False-positive rates to try.
+    """
+    words = _random_words(word_count)
+    trie = ArrayTrie()
+    trie.insert_many(words)
+    rng = random.Random(2)
+    hits = [rng.choice(words) for _ in range(probe_count // 10)]
+    miss_count = probe_count - len(hits)
+    near = []
+    while len(near) < miss_count:
+        word = rng.choice(words)
+        word = word[:-1] + rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if not trie.contains_word(word):
+            near.append(word)
+    workloads = {
+        "random misses": hits + _random_words(miss_count, seed=1),
+        "near misses": hits + near,
+    }
+
+    for name, probes in workloads.items():
+        rng.shuffle(probes)
+        print(f"  {name}:")
+        trie.disable_bloom_filter()
+        start = time.perf_counter()
+        for word in probes:
+            trie.contains_word(word)
+        print(f"    no filter: {time.perf_counter() - start:.3f}s")
+        for rate in rates:
+            trie.enable_bloom_filter(rate)
+            start = time.perf_counter()
+            for word in probes:
+                trie.contains_word(word)
+            elapsed = time.perf_counter() - start
+            stats = trie.bloom_stats()
+            print(f"    rate {rate}: {elapsed:.3f}s, {stats['bits'] // 8192} KiB,"
+                  f" {stats['hashes']} hashes, {stats['rejects']} rejects,"
+                  f" {stats['false_positives']} false positives")
+    trie.disable_bloom_filter()
+
+
+def compare_text_scan(word_count: int = 20000, text_mb: float = 2.0,
+                      naive_kb: int = 50) -> None:
+    """
+    Print the throughput of the Aho-Corasick scan vs checking substrings.
+
+    Args:
+        word_count: Number of keywords in the dictionary.
+        text_mb: Size of the scanned text in megabytes.
+        naive_kb: Size of the prefix of the text used for the (much slower)
+            substring-by-substring baseline.
+    """
+    keywords = _random_words(word_count)
+    trie = ArrayTrie()
+    trie.insert_many(keywords)
+    longest = max(map(len, keywords))
+
+    # Half dictionary words, half noise, separated by spaces and punctuation
+    rng = random.Random(4)
+    noise = _random_words(word_count, seed=5)
+    pieces = []
+    size = 0
+    while size < text_mb * 1_000_000:
+        piece = rng.choice(keywords if rng.random() < 0.5 else noise)
+        pieces.append(piece + rng.choice(" , . "))
+        size += len(piece) + 1
+    text = "".join(pieces)
+
+    start = time.perf_counter()
+    automaton = AhoCorasick(trie)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    chunks = (text[i:i + 65536] for i in range(0, len(text), 65536))
+    match_count = sum(1 for _ in automaton.scan(chunks))
+    scan_time = time.perf_counter() - start
+    print(f"  Aho-Corasick: {automaton.state_count} states compiled in "
+          f"{compile_time:.3f}s, {len(text) / scan_time / 1e6:.2f} MB/s "
+          f"({match_count} matches)")
+
+    sample = text[:naive_kb * 1000]
+    start = time.perf_counter()
+    for i in range(len(sample)):
+        for j in range(i + 1, min(i + longest, len(sample)) + 1):
+            try:
+                trie.contains_word(sample[i:j])
+            except ValueError:
+                break  # No word contains a non-letter
+    naive_time = time.perf_counter() - start
+    print(f"    substrings: {len(sample) / naive_time / 1e6:.2f} MB/s")
+
+
+def compare_prefix_counts(word_count: int = 50000, query_count: int = 200) -> None:
+    """
+    Print the time of counting by enumeration vs the subtree counters.
+
+    Args:
+        word_count: Number of random words to insert.
+        query_count: Number of random one- and two-letter prefixes to count.
+    """
+    trie = ArrayTrie()
+    trie.insert_many(_random_words(word_count))
+    rng = random.Random(3)
+    prefixes = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz")
+                        for _ in range(rng.randint(1, 2)))
+                for _ in range(query_count)]
+
+    start = time.perf_counter()
+    enumerated = [len(trie.autocomplete(prefix)) for prefix in prefixes]
+    enumerate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    counted = [trie.count_prefix(prefix) for prefix in prefixes]
+    counter_time = time.perf_counter() - start
+    assert enumerated == counted
+    print(f"  enumerate: {enumerate_time:.3f}s, counters: {counter_time:.4f}s"
+          f" for {query_count} prefixes")
 
 
 def test_trie():
@@ -277,9 +2437,88 @@ def test_trie():
         print(f"Error: {e}")
 
 
+def run_benchmarks() -> None:
+    """Print the backend, cache and search timings (python TriesPractice.py --bench)."""
+    print("Array Trie vs double-array Trie:")
+    compare_trie_backends()
+
+    print("\nDAWG bulk build:")
+    compare_bulk_build()
+
+    print("\nMulti-pattern text scan:")
+    compare_text_scan()
+
+    print("\nPrefix counts:")
+    compare_prefix_counts()
+
+    print("\nWeighted top-k autocomplete:")
+    compare_top_k_latency()
+
+    print("\nMemory-mapped LOUDS trie:")
+    compare_mmap_startup()
+
+    print("\nBatched insert/contains:")
+    compare_batch_api()
+
+    print("\nBloom filter in front of contains_word:")
+    compare_bloom_filter()
+
+    print("\nFuzzy search:")
+    compare_fuzzy_search()
+
+    print("\nConcurrent readers with one writer:")
+    stress_test_concurrent_trie()
+
+
 if __name__ == "__main__":
     test_trie()
 
+    print("\nDAWG bulk build:")
+    dawg = ArrayTrie.from_sorted(["bat", "car", "cart", "cat", "cats"])
+    print(f"Words: {dawg.autocomplete('')}, count: {dawg.count_words()}")
+    dawg.insert_word("bats")
+    dawg.remove_word("cart")
+    print(f"After insert 'bats' / remove 'cart': {dawg.autocomplete('')}")
+
+    print("\nMulti-pattern text scan:")
+    scanner = AhoCorasick(dawg)
+    print(f"Matches in 'the cats bat': {list(scanner.scan('the cats bat'))}")
+
+    print("\nPrefix counts and ranks:")
+    print(f"Words starting with 'ca': {dawg.count_prefix('ca')}, "
+          f"words before 'cat': {dawg.rank('cat')}")
+
+    print("\nWeighted top-k autocomplete:")
+    weighted = ArrayTrie(top_k=2)
+    for word, weight in (("car", 5), ("cart", 9), ("cat", 2), ("cats", 7)):
+        weighted.insert_word(word, weight)
+    print(f"Top 2 for 'ca': {weighted.autocomplete('ca', 2)}")
+    weighted.remove_word("cart")
+    print(f"Top 2 after removing 'cart': {weighted.autocomplete('ca', 2)}")
+
+    print("\nBloom filter in front of contains_word:")
+    weighted.enable_bloom_filter(0.01)
+    for word in ("car", "cab", "dog"):
+        weighted.contains_word(word)
+    print(f"Stats: {weighted.bloom_stats()}")
+    weighted.disable_bloom_filter()
+
+    print("\nFuzzy search:")
+    print(f"Within 1 edit of 'cst': {weighted.fuzzy_search('cst', 1)}")
+
+    print("\nPaginated autocomplete:")
+    cursor = None
+    while True:
+        page = list(weighted.iter_autocomplete("", limit=2, after=cursor))
+        if not page:
+            break
+        print(f"Page: {page}")
+        cursor = page[-1]
+
+    if "--bench" in sys.argv[1:]:
+        print()
+        run_benchmarks()
+
 
 # using a dictionary instead of array
 class TrieNode:
@@ -353,6 +2592,26 @@ class Trie:
             curr = curr.children[char]
         return curr.is_end_of_word
 
+    def fuzzy_search(self, word: str, max_distance: int) -> list[tuple[str, int]]:
+        """
+        Return the words within max_distance edits (Levenshtein) of word.
+
+        Args:
+            word: The word to match.
+            max_distance: Largest number of inserted, deleted or replaced
+                characters allowed.
+
+        Returns:
+            list[tuple[str, int]]: (word, distance) pairs, closest first.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if max_distance < 0:
+            raise ValueError("Max distance cannot be negative")
+
+        return _fuzzy_walk(self._root, word, max_distance,
+                           lambda node: node.children.items())
+
     def print_trie(self, node: TrieNode = None, prefix: str = "", level: int = 0) -> None:
         """
         Print a text-based visualization of the Trie structure.
@@ -370,6 +2629,209 @@ class Trie:
             self.print_trie(node.children[char], char, level + 1)
 
 
+class RadixNode:
+    """A node of the radix Trie; the edge leading to it carries label."""
+
+    __slots__ = ("label", "children", "is_end_of_word")
+
+    def __init__(self, label: str = "", is_end_of_word: bool = False):
+        self.label = label  # Characters on the edge from the parent
+        self.children = {}  # First character of the child's label: child
+        self.is_end_of_word = is_end_of_word
+
+
+class RadixTrie:
+    """
+    A radix (Patricia) Trie: chains of single-child nodes are collapsed into
+    one edge labelled with a slice of the key, so long keys such as URLs or
+    paths cost one node per branch point rather than one per character.
+    Keys may contain any characters.
+    """
+
+    def __init__(self):
+        """Initialize the Trie with an empty root node."""
+        self._root = RadixNode()
+
+    def insert_word(self, word: str) -> None:
+        """
+        Insert a word into the Trie, splitting an edge if it diverges midway.
+
+        Args:
+            word: The word to insert.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            return  # Ignore empty strings
+
+        node = self._root
+        i = 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                node.children[word[i]] = RadixNode(word[i:], True)
+                return
+            label = child.label
+            if word.startswith(label, i):
+                i += len(label)
+                node = child
+                continue
+
+            # The word leaves the edge part-way: split it at the divergence
+            common = 1  # The first character is known to match
+            while i + common < len(word) and word[i + common] == label[common]:
+                common += 1
+            middle = RadixNode(label[:common])
+            node.children[word[i]] = middle
+            child.label = label[common:]
+            middle.children[child.label[0]] = child
+            i += common
+            node = middle
+        node.is_end_of_word = True
+
+    def is_end_of_word(self, word: str) -> bool:
+        """
+        Check if a word exists in the Trie and is marked as complete.
+
+        Args:
+            word: The word to check.
+
+        Returns:
+            bool: True if the word is complete, False otherwise.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+        if not word:
+            return False
+
+        node = self._root
+        i = 0
+        while i < len(word):
+            node = node.children.get(word[i])
+            if node is None or not word.startswith(node.label, i):
+                return False
+            i += len(node.label)
+        return node.is_end_of_word
+
+    def remove_word(self, word: str) -> None:
+        """
+        Remove a word, merging edges that are left with a single child.
+
+        Args:
+            word: The word to remove.
+        """
+        if not isinstance(word, str):
+            raise TypeError("Word must be a string")
+
+        path = [self._root]
+        i = 0
+        while i < len(word):
+            node = path[-1].children.get(word[i])
+            if node is None or not word.startswith(node.label, i):
+                return  # Word not found
+            i += len(node.label)
+            path.append(node)
+        node = path[-1]
+        if node is self._root or not node.is_end_of_word:
+            return  # Word not found
+        node.is_end_of_word = False
+
+        parent = path[-2]
+        if not node.children:
+            del parent.children[node.label[0]]
+            node = parent
+            if node is self._root or node.is_end_of_word:
+                return
+            parent = path[-3]
+        if len(node.children) == 1:
+            # Fold node into its only child
+            (child,) = node.children.values()
+            child.label = node.label + child.label
+            parent.children[child.label[0]] = child
+
+    def autocomplete(self, prefix: str) -> list[str]:
+        """
+        Return the words in the Trie that start with the given prefix.
+
+        Args:
+            prefix: The prefix to search for.
+
+        Returns:
+            list[str]: Complete words starting with the prefix, sorted.
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Prefix must be a string")
+
+        node = self._root
+        word = ""
+        while len(word) < len(prefix):
+            node = node.children.get(prefix[len(word)])
+            if node is None:
+                return []  # Prefix not found
+            label = node.label
+            # The prefix may end part-way along this edge
+            if not (prefix.startswith(label, len(word))
+                    or label.startswith(prefix[len(word):])):
+                return []
+            word += label
+
+        words = []
+        stack = [(node, word)]
+        while stack:
+            node, word = stack.pop()
+            if node.is_end_of_word:
+                words.append(word)
+            for key in sorted(node.children, reverse=True):
+                child = node.children[key]
+                stack.append((child, word + child.label))
+        return words
+
+    def print_trie(self, node: RadixNode = None, level: int = 0) -> None:
+        """
+        Print a text-based visualization of the Trie structure.
+
+        Args:
+            node: The current node (defaults to root).
+            level: The depth for indentation.
+        """
+        if node is None:
+            node = self._root
+        print("  " * level + node.label + ("$" if node.is_end_of_word else ""))
+        for key in sorted(node.children):
+            self.print_trie(node.children[key], level + 1)
+
+
+def compare_radix_trie(key_count: int = 20000) -> None:
+    """
+    Print memory use and lookup latency of Trie vs RadixTrie on URL keys.
+
+    Args:
+        key_count: Number of random URL-like keys to insert.
+    """
+    rng = random.Random(0)
+    hosts = [f"https://{''.join(rng.choices('abcdefghij', k=8))}.example.com"
+             for _ in range(50)]
+    keys = [f"{rng.choice(hosts)}/api/v{rng.randint(1, 3)}/items/"
+            f"{rng.randint(0, 10 ** 9)}?page={rng.randint(1, 99)}"
+            for _ in range(key_count)]
+
+    for backend in (Trie, RadixTrie):
+        tracemalloc.start()
+        trie = backend()
+        for key in keys:
+            trie.insert_word(key)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for key in keys:
+            trie.is_end_of_word(key)
+        lookup_time = time.perf_counter() - start
+
+        print(f"{backend.__name__:>9}: {memory / 1024 / 1024:8.2f} MiB, "
+              f"{lookup_time / len(keys) * 1e6:.2f} us/lookup")
+
+
 def test_trie():
     """Test the Trie functionality and visualize its structure."""
     trie = Trie()
@@ -389,6 +2851,9 @@ def test_trie():
     print("\nTrie structure:")
     trie.print_trie()
 
+    # Test fuzzy search
+    print(f"\nWithin 1 edit of 'cst': {trie.fuzzy_search('cst', 1)}")
+
     # Test error handling
     try:
         trie.insert_word(123)  # Should raise TypeError
@@ -396,5 +2861,25 @@ def test_trie():
         print(f"\nError handling test: {e}")
 
 
+def test_radix_trie():
+    """Test the radix Trie, including edge splits and merges."""
+    trie = RadixTrie()
+    for word in ["romane", "romanus", "romulus", "rubens", "ruber", "rubicon"]:
+        trie.insert_word(word)
+    print("\nRadix Trie structure:")
+    trie.print_trie()
+    print(f"Contains 'romulus'? {trie.is_end_of_word('romulus')}")
+    print(f"Contains 'rom'? {trie.is_end_of_word('rom')}")
+    print(f"Words starting with 'rub': {trie.autocomplete('rub')}")
+    trie.remove_word("romulus")
+    print("After removing 'romulus':")
+    trie.print_trie()
+
+
 if __name__ == "__main__":
     test_trie()
+    test_radix_trie()
+
+    if "--bench" in sys.argv[1:]:
+        print("\nDict Trie vs radix Trie on URL keys:")
+        compare_radix_trie()
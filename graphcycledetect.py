@@ -1,12 +1,132 @@
+import csv
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from itertools import accumulate, islice
+from multiprocessing import Pool, shared_memory
+from types import MappingProxyType
+
+
+# Set in each reachable_from_many worker: (shared block, indptr, indices, node count)
+_worker_csr = None
+
+
+@contextmanager
+def _gc_paused():
+    """Keep the cyclic GC off while a load builds millions of acyclic sets."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _attach_csr(name: str, node_count: int, edge_count: int) -> None:
+    """Pool initializer: map the CSR arrays exported by reachable_from_many."""
+    global _worker_csr
+    # Pool workers share the parent's resource tracker, which already knows
+    # the block, so attaching here does not register it a second time
+    block = shared_memory.SharedMemory(name=name)
+    split = (node_count + 1) * 8
+    indptr = block.buf[:split].cast("q")
+    indices = block.buf[split:split + edge_count * 4].cast("i")
+    _worker_csr = (block, indptr, indices, node_count)
+
+
+def _reach_bitsets(indptr, indices, node_count: int, sources: list) -> list:
+    """Return one bitset (bytes, bit i = node id i) of the nodes reachable from each source id (-1 for none)."""
+    results = []
+    for source in sources:
+        bits = bytearray((node_count + 7) // 8)
+        if source >= 0:
+            visited = bytearray(node_count)
+            visited[source] = 1
+            reached = [source]
+            stack = [source]
+            while stack:
+                node = stack.pop()
+                for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        reached.append(neighbor)
+                        stack.append(neighbor)
+            for node in reached:
+                bits[node >> 3] |= 1 << (node & 7)
+        results.append(bytes(bits))
+    return results
+
+
+def _reach_task(sources: list) -> list:
+    """Pool task: run _reach_bitsets for a chunk of source ids on the shared CSR."""
+    _, indptr, indices, node_count = _worker_csr
+    return _reach_bitsets(indptr, indices, node_count, sources)
+
+
+def _edge_file_chunks(path: str, fmt: str, chunk_size: int):
+    """
+    Yield the edges of an edge-list file as flat [from, to, from, to, ...] chunks.
+
+    Raises ValueError naming the file and line (or byte offset, for binary
+    files) of the first row that is not exactly one pair of labels.
+    """
+    if fmt == "binary":
+        with open(path, "rb") as file:
+            offset = 0
+            while True:
+                data = file.read(8 * chunk_size)
+                if not data:
+                    return
+                if len(data) % 8:
+                    raise ValueError(
+                        f"{path}: truncated record at byte {offset + len(data) - len(data) % 8}, "
+                        "expected pairs of 32-bit node ids")
+                ids = array("I")
+                ids.frombytes(data)
+                if sys.byteorder == "big":
+                    ids.byteswap()
+                yield ids
+                offset += len(data)
+
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file, delimiter="," if fmt == "csv" else "\t")
+        try:
+            while True:
+                flat = []
+                rows = 0
+                for row in islice(reader, chunk_size):
+                    rows += 1
+                    if len(row) == 2:
+                        flat += row
+                    elif row:  # Blank lines are skipped
+                        raise ValueError(f"{path}, line {reader.line_num}: "
+                                         f"expected 2 fields, got {len(row)}")
+                if not rows:
+                    return
+                yield flat
+        except csv.Error as error:
+            raise ValueError(f"{path}, line {reader.line_num}: {error}") from error
+
+
 class Graph:
     def __init__(self):
         self.adj_list = {}
+        self.in_adj = {}  # node -> nodes with an edge into it
 
     def add_node(self, node: str) -> bool:
         """Add a node to the graph if it doesn't exist."""
         if node in self.adj_list:
             return False
         self.adj_list[node] = set()
+        self.in_adj[node] = set()
         return True
 
     def remove_node(self, node: str) -> bool:
@@ -14,14 +134,42 @@ class Graph:
         if node not in self.adj_list:
             return False
 
-        # Remove all edges pointing to this node
-        for other_node in self.adj_list:
-            self.adj_list[other_node].discard(node)
+        # Remove all edges pointing to this node, and their reverse entries
+        for predecessor in self.in_adj[node]:
+            self.adj_list[predecessor].discard(node)
+        for successor in self.adj_list[node]:
+            self.in_adj[successor].discard(node)
 
         # Remove the node itself
         del self.adj_list[node]
+        del self.in_adj[node]
         return True
 
+    def remove_nodes(self, nodes) -> int:
+        """Remove several nodes and their edges in one pass, returning how many were removed."""
+        doomed = {node for node in nodes if node in self.adj_list}
+        for node in doomed:
+            # Edges between two removed nodes disappear with the nodes
+            for predecessor in self.in_adj.pop(node):
+                if predecessor not in doomed:
+                    self.adj_list[predecessor].discard(node)
+            for successor in self.adj_list.pop(node):
+                if successor not in doomed:
+                    self.in_adj[successor].discard(node)
+        return len(doomed)
+
+    def predecessors(self, node: str) -> list:
+        """Return the nodes with an edge into node."""
+        if node not in self.in_adj:
+            return []
+        return list(self.in_adj[node])
+
+    def in_degree(self, node: str) -> int:
+        """Return the number of edges into node."""
+        if node not in self.in_adj:
+            return 0
+        return len(self.in_adj[node])
+
     def add_edge(self, from_node: str, to_node: str) -> bool:
         """Add an edge between two nodes."""
         # Check if both nodes exist, add them if they don't
@@ -33,9 +181,78 @@ class Graph:
         # Add the edge
         if to_node not in self.adj_list[from_node]:
             self.adj_list[from_node].add(to_node)
+            self.in_adj[to_node].add(from_node)
             return True
         return False
 
+    def add_edges(self, edges) -> int:
+        """Add many (from_node, to_node) edges, returning how many were new."""
+        with _gc_paused():
+            return self._add_edge_batch(edges, {})
+
+    def _add_edge_batch(self, edges, labels: dict) -> int:
+        """Add edges, storing one shared object per distinct label via the labels table."""
+        adj_list = self.adj_list
+        in_adj = self.in_adj
+        intern = labels.setdefault
+        added = 0
+        for from_node, to_node in edges:
+            # Equal labels read from a file are separate objects; keep the first
+            from_node = intern(from_node, from_node)
+            to_node = intern(to_node, to_node)
+            targets = adj_list.get(from_node)
+            if targets is None:
+                targets = adj_list[from_node] = set()
+                in_adj[from_node] = set()
+            sources = in_adj.get(to_node)
+            if sources is None:
+                adj_list[to_node] = set()
+                sources = in_adj[to_node] = set()
+            if to_node not in targets:
+                targets.add(to_node)
+                sources.add(from_node)
+                added += 1
+        return added
+
+    @classmethod
+    def from_edge_file(cls, path: str, fmt: str = "csv", chunk_size: int = 65536,
+                       frozen: bool = False) -> "Graph | FrozenGraph":
+        """
+        Build a graph from an edge-list file, streaming it chunk_size edges at a time.
+
+        "csv" and "tsv" files hold one "from,to" (or tab-separated) pair of
+        labels per line, read with the csv module so quoted labels work.
+        "binary" files hold little-endian pairs of unsigned 32-bit ints,
+        which become the node labels. A malformed line or truncated record
+        raises ValueError naming the file and where it is.
+
+        With frozen=True the labels are interned to dense int ids as they
+        are read and a FrozenGraph is built straight from the id arrays.
+        Edges then cost 4 bytes each plus the label table, against about
+        230 bytes in a dict of sets, so use it for large read-only inputs.
+        """
+        if fmt not in ("csv", "tsv", "binary"):
+            raise ValueError('fmt must be "csv", "tsv" or "binary"')
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        chunks = _edge_file_chunks(path, fmt, chunk_size)
+
+        if frozen:
+            # Missing labels get the next id: table[label] is len(table)
+            table = defaultdict()
+            table.default_factory = table.__len__
+            endpoints = array("i")
+            for flat in chunks:
+                endpoints.extend(map(table.__getitem__, flat))
+            return FrozenGraph._from_endpoints(list(table), endpoints)
+
+        graph = cls()
+        labels = {}  # label -> the one object stored for it
+        with _gc_paused():
+            for flat in chunks:
+                graph._add_edge_batch(zip(flat[::2], flat[1::2]), labels)
+        return graph
+
     def remove_edge(self, from_node: str, to_node: str) -> bool:
         """Remove an edge between two nodes."""
         if from_node not in self.adj_list or to_node not in self.adj_list:
@@ -43,6 +260,7 @@ class Graph:
 
         if to_node in self.adj_list[from_node]:
             self.adj_list[from_node].discard(to_node)
+            self.in_adj[to_node].discard(from_node)
             return True
         return False
 
@@ -51,96 +269,280 @@ class Graph:
         if start_node not in self.adj_list:
             return []
 
-        visited = set()
-        traversal_order = []
-
-        def dfs_recursive(node: str):
-            visited.add(node)
-            traversal_order.append(node)
-            for neighbor in self.adj_list[node]:
+        visited = {start_node}
+        traversal_order = [start_node]
+        # Each entry is the iterator over a node's remaining neighbors, so a
+        # node resumes where it left off, exactly like a recursive call
+        stack = [iter(self.adj_list[start_node])]
+        while stack:
+            for neighbor in stack[-1]:
                 if neighbor not in visited:
-                    dfs_recursive(neighbor)
-
-        dfs_recursive(start_node)
+                    visited.add(neighbor)
+                    traversal_order.append(neighbor)
+                    stack.append(iter(self.adj_list[neighbor]))
+                    break
+            else:
+                stack.pop()
         return traversal_order
 
-    def bfs_recursive(self, start_node: str) -> list:
-        """Perform breadth-first search starting from start_node using recursion, returning the traversal order."""
+    def bfs(self, start_node: str) -> list:
+        """Perform breadth-first search starting from start_node, returning the traversal order."""
         if start_node not in self.adj_list:
             return []
 
-        visited = set()
+        # Nodes are marked when queued, so each is queued at most once
+        visited = {start_node}
         traversal_order = []
-        queue = [start_node]
+        queue = deque([start_node])
+        while queue:
+            node = queue.popleft()
+            traversal_order.append(node)
+            # Add unvisited neighbors to the queue
+            # Sorted for consistent order
+            for neighbor in sorted(self.adj_list[node]):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+        return traversal_order
+
+    def bfs_recursive(self, start_node: str) -> list:
+        """Same as bfs (now iterative); kept for existing callers."""
+        return self.bfs(start_node)
 
-        def bfs_recursive_helper():
-            if not queue:
+    def bfs_levels(self, start_node: str, max_depth: int = None):
+        """Yield the nodes at each distance from start_node, one level (list) at a time, up to max_depth."""
+        if start_node not in self.adj_list:
+            return
+        visited = {start_node}
+        frontier = [start_node]
+        depth = 0
+        while frontier:
+            yield frontier
+            if max_depth is not None and depth >= max_depth:
                 return
-            # Process the next node in the queue
-            node = queue.pop(0)
-            if node not in visited:
-                visited.add(node)
-                traversal_order.append(node)
-                # Add unvisited neighbors to the queue
-                # Sorted for consistent order
-                for neighbor in sorted(self.adj_list[node]):
-                    if neighbor not in visited and neighbor not in queue:
-                        queue.append(neighbor)
-            # Recurse on the remaining queue
-            bfs_recursive_helper()
-
-        bfs_recursive_helper()
-        return traversal_order
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self.adj_list[node]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
 
     def topological(self, start_node: str) -> list:
         """Perform topological sort starting from start_node, returning the topological order."""
         if start_node not in self.adj_list:
             return []
 
-        visited = set()
+        visited = {start_node}
         stack = []
-
-        def topo_recursive(node: str):
-            visited.add(node)
+        pending = [(start_node, iter(self.adj_list[start_node]))]
+        while pending:
+            node, neighbors = pending[-1]
             # Visit all neighbors first
-            for neighbor in self.adj_list[node]:
+            for neighbor in neighbors:
                 if neighbor not in visited:
-                    topo_recursive(neighbor)
-            # Add node to stack after all neighbors are processed
-            stack.append(node)
-
-        topo_recursive(start_node)
+                    visited.add(neighbor)
+                    pending.append((neighbor, iter(self.adj_list[neighbor])))
+                    break
+            else:
+                # Add node to stack after all neighbors are processed
+                pending.pop()
+                stack.append(node)
         # Reverse the stack to get the topological order
         return stack[::-1]
 
+    def topological_order(self) -> list:
+        """Return a topological order of the whole graph (Kahn's algorithm)."""
+        in_degree = {node: len(sources) for node, sources in self.in_adj.items()}
+
+        # Repeatedly take a node that no remaining node points to
+        ready = deque(node for node, degree in in_degree.items() if not degree)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for neighbor in self.adj_list[node]:
+                in_degree[neighbor] -= 1
+                if not in_degree[neighbor]:
+                    ready.append(neighbor)
+
+        if len(order) != len(self.adj_list):
+            # Nodes on a cycle never reach in-degree 0
+            cycle = " -> ".join(map(str, self.find_cycle()))
+            raise ValueError(f"Graph has a cycle: {cycle}")
+        return order
+
+    def find_cycle(self) -> list:
+        """Return a cycle as a path [a, b, ..., a], or an empty list if the graph has none."""
+        visited = set()
+        # Nodes on the current DFS path, mapped to their position in it
+        on_path = {}
+
+        # Check all nodes to handle disconnected components
+        for root in self.adj_list:
+            if root in visited:
+                continue
+            visited.add(root)
+            on_path[root] = 0
+            path = [root]
+            stack = [iter(self.adj_list[root])]
+            while stack:
+                # Explore neighbors
+                for neighbor in stack[-1]:
+                    if neighbor in on_path:
+                        # Back edge found (neighbor is on the current path)
+                        return path[on_path[neighbor]:] + [neighbor]
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        on_path[neighbor] = len(path)
+                        path.append(neighbor)
+                        stack.append(iter(self.adj_list[neighbor]))
+                        break
+                else:
+                    # Remove node from the path when done exploring
+                    stack.pop()
+                    del on_path[path.pop()]
+        return []
+
     def has_cycle(self) -> bool:
         """Detect if the directed graph contains a cycle."""
-        visited = set()
-        rec_stack = set()  # Tracks nodes in the current recursion stack
+        return bool(self.find_cycle())
 
-        def cycle_dfs(node: str) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
+    def strongly_connected_components(self) -> list:
+        """
+        Return the strongly connected components as lists of nodes (iterative Tarjan).
 
-            # Explore neighbors
-            for neighbor in self.adj_list[node]:
-                if neighbor not in visited:
-                    if cycle_dfs(neighbor):
-                        return True
-                elif neighbor in rec_stack:
-                    # Back edge found (neighbor is in current recursion stack)
-                    return True
+        Components come in topological order: every edge between two
+        components goes from an earlier one to a later one.
+        """
+        index = {}  # node -> DFS discovery number, or finished once assigned
+        low = {}  # node -> lowest discovery number reachable on the stack
+        # Larger than any discovery number, so edges into a component that
+        # is already complete never lower low[]
+        finished = len(self.adj_list)
+        stack = []
+        components = []
+        counter = 0
 
-            # Remove node from recursion stack when done exploring
-            rec_stack.remove(node)
-            return False
+        for root in self.adj_list:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            work = [(root, iter(self.adj_list[root]))]
+            while work:
+                node, neighbors = work[-1]
+                for neighbor in neighbors:
+                    number = index.get(neighbor)
+                    if number is None:
+                        index[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        work.append((neighbor, iter(self.adj_list[neighbor])))
+                        break
+                    if number < low[node]:
+                        low[node] = number  # neighbor is still on the stack
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == index[node]:
+                        # node is the root of a component: pop its members
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            index[member] = finished
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
 
-        # Check all nodes to handle disconnected components
-        for node in self.adj_list:
-            if node not in visited:
-                if cycle_dfs(node):
-                    return True
-        return False
+        # Tarjan finishes sink components first
+        components.reverse()
+        return components
+
+    def condense(self) -> tuple:
+        """
+        Return (dag, component_of, members) for the condensation of the graph.
+
+        dag is a DAG whose node i stands for the component members[i], and
+        component_of maps every node to its component. Component ids are in
+        topological order, so every edge of dag goes from a lower id to a higher one.
+        """
+        members = self.strongly_connected_components()
+        component_of = {}
+        for component, nodes in enumerate(members):
+            for node in nodes:
+                component_of[node] = component
+
+        dag = DAG()
+        for component in range(len(members)):
+            dag.add_node(component)
+        for node, neighbors in self.adj_list.items():
+            source = component_of[node]
+            for neighbor in neighbors:
+                target = component_of[neighbor]
+                if source != target:
+                    dag.add_edge(source, target)
+        return dag, component_of, members
+
+    def _csr(self) -> tuple:
+        """Return (ids, indptr, indices) with node ids in adj_list order."""
+        ids = {node: i for i, node in enumerate(self.adj_list)}
+        indptr = array("q", [0])
+        indices = array("i")
+        for neighbors in self.adj_list.values():
+            indices.extend(map(ids.__getitem__, neighbors))
+            indptr.append(len(indices))
+        return ids, indptr, indices
+
+    def reachable_from_many(self, sources, workers: int = None) -> list:
+        """
+        Return, for each source, the set of nodes reachable from it as a bitset.
+
+        Bit i of a result (byte i // 8, bit i % 8) stands for the i-th node
+        of list(adj_list); int.from_bytes(bits, "little") turns it into an
+        int mask. A source that is not in the graph reaches nothing. The
+        adjacency is exported once as CSR arrays into shared memory, and the
+        sources are split into chunks across a pool of worker processes, so
+        only source ids and result bitsets are ever pickled.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        elif workers < 1:
+            raise ValueError("workers must be at least 1")
+        ids, indptr, indices = self._csr()
+        source_ids = [ids.get(source, -1) for source in sources]
+        node_count = len(ids)
+        if workers == 1 or len(source_ids) < 2:
+            return _reach_bitsets(indptr, indices, node_count, source_ids)
+
+        split = len(indptr) * indptr.itemsize
+        block = shared_memory.SharedMemory(
+            create=True, size=max(1, split + len(indices) * indices.itemsize))
+        try:
+            block.buf[:split] = memoryview(indptr).cast("B")
+            block.buf[split:split + len(indices) * indices.itemsize] = memoryview(indices).cast("B")
+            # A few chunks per worker balances uneven reachable set sizes
+            size = max(1, -(-len(source_ids) // (4 * workers)))
+            chunks = [source_ids[i:i + size] for i in range(0, len(source_ids), size)]
+            results = []
+            with Pool(workers, initializer=_attach_csr,
+                      initargs=(block.name, node_count, len(indices))) as pool:
+                for part in pool.map(_reach_task, chunks):
+                    results.extend(part)
+            return results
+        finally:
+            block.close()
+            block.unlink()
+
+    def freeze(self) -> "FrozenGraph":
+        """Return an immutable CSR copy of the graph for fast read-only traversals."""
+        return FrozenGraph(self.adj_list)
 
     def __str__(self) -> str:
         """Return a string representation of the graph."""
@@ -151,6 +553,1036 @@ class Graph:
         return "\n".join(result)
 
 
+class DAG(Graph):
+    """
+    A Graph that stays acyclic: add_edge rejects any edge closing a cycle.
+
+    A topological order is kept up to date with the Pearce-Kelly algorithm.
+    An edge that already agrees with the order is accepted right away. For
+    one that does not, only the nodes whose position lies between its two
+    endpoints are searched and, if no cycle is found, reordered among the
+    positions they already held.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # The topological order is reversed(_front) + _order. Position p >= 0
+        # is _order[p] and p < 0 is _front[-p - 1], so nodes can be added at
+        # either end. Removed nodes leave None holes until the next compaction.
+        self._order = []
+        self._front = []
+        self._position = {}  # node -> position
+        self._holes = 0
+
+    def _set_slot(self, position: int, node) -> None:
+        """Store node (or a None hole) at position."""
+        if position >= 0:
+            self._order[position] = node
+        else:
+            self._front[-position - 1] = node
+
+    def add_node(self, node: str) -> bool:
+        """Add a node to the graph if it doesn't exist."""
+        if not super().add_node(node):
+            return False
+        # A node without edges can go anywhere, so put it last
+        self._position[node] = len(self._order)
+        self._order.append(node)
+        return True
+
+    def add_edge(self, from_node: str, to_node: str) -> bool:
+        """Add an edge between two nodes, raising ValueError if it would create a cycle."""
+        if from_node == to_node:
+            raise ValueError(f"Edge {from_node} -> {to_node} would create a cycle")
+        # A new source has no in-edges yet, so it can go first; a new target
+        # goes last. Either way the edge agrees with the order.
+        if from_node not in self.adj_list:
+            Graph.add_node(self, from_node)
+            self._front.append(from_node)
+            self._position[from_node] = -len(self._front)
+        self.add_node(to_node)
+
+        lower = self._position[to_node]
+        upper = self._position[from_node]
+        if lower < upper and to_node not in self.adj_list[from_node]:
+            self._reorder(from_node, to_node, lower, upper)
+        return super().add_edge(from_node, to_node)
+
+    def _add_edge_batch(self, edges, labels: dict) -> int:
+        """Add edges one at a time, so each one is checked for cycles."""
+        added = 0
+        for from_node, to_node in edges:
+            added += self.add_edge(labels.setdefault(from_node, from_node),
+                                   labels.setdefault(to_node, to_node))
+        return added
+
+    def _reorder(self, from_node: str, to_node: str, lower: int, upper: int) -> None:
+        """Move the nodes between positions lower and upper so from_node -> to_node fits."""
+        position = self._position
+
+        # Nodes reachable from to_node that currently sit before from_node
+        parent = {to_node: None}
+        forward = [to_node]
+        stack = [to_node]
+        while stack:
+            node = stack.pop()
+            for successor in self.adj_list[node]:
+                if successor == from_node:
+                    path = [from_node]
+                    while node is not None:
+                        path.append(node)
+                        node = parent[node]
+                    cycle = " -> ".join(map(str, [from_node] + path[::-1]))
+                    raise ValueError(
+                        f"Edge {from_node} -> {to_node} would create a cycle: {cycle}")
+                if successor not in parent and position[successor] < upper:
+                    parent[successor] = node
+                    forward.append(successor)
+                    stack.append(successor)
+
+        # Nodes that reach from_node and currently sit after to_node
+        seen = {from_node}
+        backward = [from_node]
+        stack = [from_node]
+        while stack:
+            node = stack.pop()
+            for predecessor in self.in_adj[node]:
+                if predecessor not in seen and position[predecessor] > lower:
+                    seen.add(predecessor)
+                    backward.append(predecessor)
+                    stack.append(predecessor)
+
+        # Reuse the same positions: everything that reaches from_node first,
+        # then everything to_node reaches, each group keeping its relative order
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        slots = sorted(position[node] for node in backward + forward)
+        for node, slot in zip(backward + forward, slots):
+            position[node] = slot
+            self._set_slot(slot, node)
+
+    def _forget(self, node: str) -> None:
+        """Drop a removed node from the order, compacting it once half of it is holes."""
+        self._set_slot(self._position.pop(node), None)
+        self._holes += 1
+        if 2 * self._holes > len(self._order) + len(self._front):
+            self._order = self.topological_order()
+            self._front = []
+            self._position = {n: i for i, n in enumerate(self._order)}
+            self._holes = 0
+
+    def remove_node(self, node: str) -> bool:
+        """Remove a node and all its edges from the graph."""
+        if not super().remove_node(node):
+            return False
+        self._forget(node)
+        return True
+
+    def remove_nodes(self, nodes) -> int:
+        """Remove several nodes and their edges in one pass, returning how many were removed."""
+        doomed = {node for node in nodes if node in self.adj_list}
+        super().remove_nodes(doomed)
+        for node in doomed:
+            self._forget(node)
+        return len(doomed)
+
+    def topological_order(self) -> list:
+        """Return the maintained topological order of the whole graph in O(V)."""
+        order = self._front[::-1] + self._order
+        if not self._holes:
+            return order
+        return [node for node in order if node is not None]
+
+    def find_cycle(self) -> list:
+        """A DAG never has a cycle."""
+        return []
+
+
+class FrozenGraph:
+    """
+    An immutable directed graph in compressed sparse row (CSR) form.
+
+    Node labels are interned to ids 0..n-1, in label order when the labels
+    can be compared (insertion order otherwise). The out-neighbors of id i
+    are indices[indptr[i]:indptr[i + 1]], sorted by id, so traversals run
+    over two flat arrays instead of a dict of sets.
+    """
+
+    ALPHA = 14  # bfs_levels goes bottom-up when frontier edges > unexplored / ALPHA
+    BETA = 24  # and back to top-down when the frontier < node_count / BETA
+
+    def __init__(self, adj_list: dict):
+        """Build the CSR arrays from an adjacency dict of sets."""
+        labels = list(adj_list)
+        try:
+            labels.sort()
+        except TypeError:
+            labels = list(adj_list)  # Mixed label types keep insertion order
+        ids = {label: i for i, label in enumerate(labels)}
+
+        indptr = array("q", [0])
+        indices = array("i")
+        for label in labels:
+            indices.extend(sorted(map(ids.__getitem__, adj_list[label])))
+            indptr.append(len(indices))
+        self._set_csr(labels, ids, indptr, indices)
+
+    def _set_csr(self, labels: list, ids: dict, indptr: array, indices: array) -> None:
+        """Store the label table and CSR arrays built by __init__ or _from_endpoints."""
+        self.labels = tuple(labels)
+        self.ids = MappingProxyType(ids)
+        self._ids = ids
+        self._indptr = indptr
+        self._indices = indices
+        self._reverse = None  # In-edge CSR, built on first use
+
+    @classmethod
+    def _from_endpoints(cls, labels: list, endpoints: array) -> "FrozenGraph":
+        """
+        Build the CSR arrays from edges given as ids into labels.
+
+        endpoints holds from, to, from, to, ... ids. Ids are renumbered to
+        label order like __init__, then edges are bucketed by source with a
+        counting sort and each row is sorted and deduplicated.
+        """
+        node_count = len(labels)
+        order = list(range(node_count))
+        try:
+            order.sort(key=labels.__getitem__)
+        except TypeError:
+            pass  # Mixed label types keep first-seen order
+        else:
+            renumber = array("i", bytes(4 * node_count))
+            for new, old in enumerate(order):
+                renumber[old] = new
+            endpoints = array("i", map(renumber.__getitem__, endpoints))
+            labels = [labels[old] for old in order]
+
+        sources = endpoints[::2]
+        targets = endpoints[1::2]
+        del endpoints
+        counts = [0] * (node_count + 1)
+        for source in sources:
+            counts[source + 1] += 1
+        starts = array("q", accumulate(counts))
+        del counts
+        bucketed = array("i", bytes(4 * len(targets)))
+        slot = list(starts[:-1])  # Next free position per row
+        for source, target in zip(sources, targets):
+            bucketed[slot[source]] = target
+            slot[source] += 1
+        del sources, targets, slot
+
+        indptr = array("q", [0])
+        indices = array("i")
+        for node in range(node_count):
+            indices.extend(sorted(set(bucketed[starts[node]:starts[node + 1]])))
+            indptr.append(len(indices))
+        graph = cls.__new__(cls)
+        graph._set_csr(labels, {label: i for i, label in enumerate(labels)}, indptr, indices)
+        return graph
+
+    @property
+    def indptr(self) -> memoryview:
+        """Read-only view of the row offsets (length node_count + 1)."""
+        return memoryview(self._indptr).toreadonly()
+
+    @property
+    def indices(self) -> memoryview:
+        """Read-only view of the neighbor ids of all rows, back to back."""
+        return memoryview(self._indices).toreadonly()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.labels)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._indices)
+
+    def nbytes(self) -> int:
+        """Return the size of the CSR arrays in bytes."""
+        return (len(self._indptr) * self._indptr.itemsize
+                + len(self._indices) * self._indices.itemsize)
+
+    def neighbors(self, node) -> list:
+        """Return the out-neighbors of node in id order."""
+        if node not in self._ids:
+            return []
+        i = self._ids[node]
+        labels = self.labels
+        return [labels[j] for j in self._indices[self._indptr[i]:self._indptr[i + 1]]]
+
+    def _row(self, node: int):
+        """Return an iterator over the neighbor ids of node."""
+        return iter(self._indices[self._indptr[node]:self._indptr[node + 1]])
+
+    def _reverse_csr(self) -> tuple:
+        """Return (indptr, indices) of the in-edges, building them once."""
+        if self._reverse is None:
+            indptr = self._indptr
+            indices = self._indices
+            counts = [0] * (len(self.labels) + 1)
+            for target in indices:
+                counts[target + 1] += 1
+            reverse_indptr = array("q", accumulate(counts))
+            reverse_indices = array("i", bytes(len(indices) * indices.itemsize))
+            slot = list(reverse_indptr[:-1])  # Next free position per row
+            # Sources are visited in id order, so every in-row comes out sorted
+            for source in range(len(self.labels)):
+                for target in indices[indptr[source]:indptr[source + 1]]:
+                    reverse_indices[slot[target]] = source
+                    slot[target] += 1
+            self._reverse = (reverse_indptr, reverse_indices)
+        return self._reverse
+
+    def dfs(self, start_node) -> list:
+        """Perform depth-first search starting from start_node, returning the traversal order."""
+        if start_node not in self._ids:
+            return []
+        start = self._ids[start_node]
+        row = self._row
+        visited = bytearray(len(self.labels))
+        visited[start] = 1
+        order = [start]
+        # Each entry holds the iterator over the neighbors still to look at,
+        # so a node resumes where it left off like a recursive call would
+        stack = [row(start)]
+        while stack:
+            for neighbor in stack[-1]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    order.append(neighbor)
+                    stack.append(row(neighbor))
+                    break
+            else:
+                stack.pop()
+        labels = self.labels
+        return [labels[i] for i in order]
+
+    def bfs(self, start_node) -> list:
+        """Perform breadth-first search starting from start_node, returning the traversal order."""
+        if start_node not in self._ids:
+            return []
+        indptr = self._indptr
+        indices = self._indices
+        start = self._ids[start_node]
+        visited = bytearray(len(self.labels))
+        visited[start] = 1
+        order = []
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+        labels = self.labels
+        return [labels[i] for i in order]
+
+    def bfs_levels(self, start_node, max_depth: int = None,
+                   direction_optimizing: bool = True):
+        """
+        Yield the nodes at each distance from start_node, one level (list) at a time, up to max_depth.
+
+        Small frontiers are expanded top-down along their out-edges. Once
+        the frontier's out-edges outnumber the unexplored edges / ALPHA, it
+        switches to bottom-up: every unvisited node scans its in-edges and
+        stops at the first parent in the frontier. It switches back when
+        the frontier shrinks below node_count / BETA. Within a level, nodes
+        come in discovery order top-down and in id order bottom-up.
+        """
+        if start_node not in self._ids:
+            return
+        indptr = self._indptr
+        indices = self._indices
+        labels = self.labels
+        node_count = len(labels)
+        start = self._ids[start_node]
+        visited = bytearray(node_count)
+        visited[start] = 1
+        frontier = [start]
+        unexplored_edges = len(indices) - (indptr[start + 1] - indptr[start])
+        bottom_up = False
+        depth = 0
+        while frontier:
+            yield [labels[i] for i in frontier]
+            if max_depth is not None and depth >= max_depth:
+                return
+            depth += 1
+
+            if direction_optimizing:
+                frontier_edges = sum(indptr[i + 1] - indptr[i] for i in frontier)
+                if not bottom_up:
+                    bottom_up = frontier_edges * self.ALPHA > unexplored_edges
+                else:
+                    bottom_up = len(frontier) * self.BETA >= node_count
+
+            next_frontier = []
+            if bottom_up:
+                reverse_indptr, reverse_indices = self._reverse_csr()
+                in_frontier = bytearray(node_count)
+                for i in frontier:
+                    in_frontier[i] = 1
+                node = visited.find(0)
+                while node != -1:
+                    for parent in reverse_indices[reverse_indptr[node]:reverse_indptr[node + 1]]:
+                        if in_frontier[parent]:
+                            visited[node] = 1
+                            next_frontier.append(node)
+                            break
+                    node = visited.find(0, node + 1)  # Skip visited nodes in C
+            else:
+                for i in frontier:
+                    for neighbor in indices[indptr[i]:indptr[i + 1]]:
+                        if not visited[neighbor]:
+                            visited[neighbor] = 1
+                            next_frontier.append(neighbor)
+            unexplored_edges -= sum(indptr[i + 1] - indptr[i] for i in next_frontier)
+            frontier = next_frontier
+
+    def topological(self, start_node) -> list:
+        """Perform topological sort starting from start_node, returning the topological order."""
+        if start_node not in self._ids:
+            return []
+        start = self._ids[start_node]
+        row = self._row
+        visited = bytearray(len(self.labels))
+        visited[start] = 1
+        finished = []
+        stack = [(start, row(start))]
+        while stack:
+            node, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    stack.append((neighbor, row(neighbor)))
+                    break
+            else:
+                # All neighbors are done, so node goes after them
+                stack.pop()
+                finished.append(node)
+        labels = self.labels
+        return [labels[i] for i in reversed(finished)]
+
+    def has_cycle(self) -> bool:
+        """Detect if the directed graph contains a cycle."""
+        row = self._row
+        state = bytearray(len(self.labels))  # 0 new, 1 on the stack, 2 done
+        for root in range(len(self.labels)):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, row(root))]
+            while stack:
+                node, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if state[neighbor] == 1:
+                        return True  # Back edge to a node on the stack
+                    if not state[neighbor]:
+                        state[neighbor] = 1
+                        stack.append((neighbor, row(neighbor)))
+                        break
+                else:
+                    stack.pop()
+                    state[node] = 2
+        return False
+
+
+class ReachabilityIndex:
+    """
+    Answers "can a reach b" for a mostly static Graph without a full search.
+
+    The graph is condensed into its DAG of strongly connected components,
+    numbered in topological order, so a component can only reach components
+    with a higher id. On top of that:
+
+    - tree-cover intervals: pre-order ranges of a spanning forest of the
+      DAG; b inside a's range proves a reaches b;
+    - GRAIL intervals: [lowest post-order rank below c, rank of c] for a few
+      randomized DFS orders; b's interval outside a's proves a does not;
+    - for DAGs of at most closure_limit components, a full transitive
+      closure as one int bitset per component, which answers every query.
+
+    Queries that none of these settle fall back to a search of the DAG that
+    the same filters prune, which in practice touches only a few nodes.
+
+    Edges added through add_edge after a build are kept in a small overlay
+    of component pairs instead of triggering a rebuild. A query that the
+    built index answers with "no" then checks whether a chain of overlay
+    edges connects the two, and only once the overlay grows past
+    overlay_limit edges is the index rebuilt, on the next query.
+    """
+
+    def __init__(self, graph: Graph, labelings: int = 2, closure_limit: int = 4096,
+                 seed: int = 0, overlay_limit: int = 64):
+        """Index graph; later changes must go through add_edge (or be followed by rebuild)."""
+        if not isinstance(graph, Graph):
+            raise TypeError("graph must be a Graph")
+        if labelings < 1:
+            raise ValueError("labelings must be at least 1")
+        if overlay_limit < 0:
+            raise ValueError("overlay_limit cannot be negative")
+        self.graph = graph
+        self.labelings = labelings
+        self.closure_limit = closure_limit
+        self.overlay_limit = overlay_limit
+        self._rng = random.Random(seed)
+        self.rebuild_count = 0  # Builds so far, the first one included
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute the index from the current graph."""
+        self.rebuild_count += 1
+        dag, component_of, members = self.graph.condense()
+        count = len(members)
+        indptr = array("q", [0])
+        indices = array("i")
+        for component in range(count):
+            indices.extend(sorted(dag.adj_list[component]))
+            indptr.append(len(indices))
+        self._component_of = component_of
+        self._indptr = indptr
+        self._indices = indices
+
+        # Tree cover: component ids are topological, so scanning them in
+        # order starts every DFS tree at a component nobody else reaches first
+        pre = array("i", bytes(4 * count))
+        last = array("i", bytes(4 * count))  # Largest pre number in the subtree
+        visited = bytearray(count)
+        counter = 0
+        for root in range(count):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            pre[root] = counter
+            counter += 1
+            stack = [(root, iter(indices[indptr[root]:indptr[root + 1]]))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if not visited[child]:
+                        visited[child] = 1
+                        pre[child] = counter
+                        counter += 1
+                        stack.append((child, iter(indices[indptr[child]:indptr[child + 1]])))
+                        break
+                else:
+                    stack.pop()
+                    last[node] = counter - 1
+        self._pre = pre
+        self._last = last
+
+        # GRAIL: a post-order rank from a randomized DFS, and the lowest rank
+        # anywhere below each component (children always rank lower)
+        self._grail = []
+        for _ in range(self.labelings):
+            rank = array("i", bytes(4 * count))
+            visited = bytearray(count)
+            counter = 0
+            roots = list(range(count))
+            self._rng.shuffle(roots)
+            for root in roots:
+                if visited[root]:
+                    continue
+                visited[root] = 1
+                children = list(indices[indptr[root]:indptr[root + 1]])
+                self._rng.shuffle(children)
+                stack = [(root, iter(children))]
+                while stack:
+                    node, children = stack[-1]
+                    for child in children:
+                        if not visited[child]:
+                            visited[child] = 1
+                            grandchildren = list(indices[indptr[child]:indptr[child + 1]])
+                            self._rng.shuffle(grandchildren)
+                            stack.append((child, iter(grandchildren)))
+                            break
+                    else:
+                        stack.pop()
+                        rank[node] = counter
+                        counter += 1
+            low = array("i", rank)
+            for component in range(count - 1, -1, -1):
+                for child in indices[indptr[component]:indptr[component + 1]]:
+                    if low[child] < low[component]:
+                        low[component] = low[child]
+            self._grail.append((low, rank))
+
+        # Full closure for small DAGs: bit d of closure[c] is set when c reaches d
+        self._closure = None
+        if count <= self.closure_limit:
+            closure = [0] * count
+            for component in range(count - 1, -1, -1):
+                bits = 1 << component
+                for child in indices[indptr[component]:indptr[component + 1]]:
+                    bits |= closure[child]
+                closure[component] = bits
+            self._closure = closure
+        self._component_count = count  # Components the arrays cover
+        self._next_component = count  # For nodes added since the build
+        self._overlay = []  # (from, to) component pairs added since the build
+        self._stale = False
+
+    def nbytes(self) -> int:
+        """Return the approximate size of the index in bytes (excluding the component map)."""
+        arrays = [self._indptr, self._indices, self._pre, self._last]
+        arrays += [labels for labeling in self._grail for labels in labeling]
+        size = sum(len(a) * a.itemsize for a in arrays)
+        if self._closure is not None:
+            size += sum(sys.getsizeof(bits) for bits in self._closure)
+        return size
+
+    def component_of(self, node) -> int:
+        """Return the id of node's strongly connected component (KeyError if unknown)."""
+        if self._stale:
+            self.rebuild()
+        return self._component_of[node]
+
+    def _may_reach(self, source: int, target: int) -> bool:
+        """Return False if the GRAIL intervals prove source cannot reach target."""
+        for low, rank in self._grail:
+            if low[target] < low[source] or rank[target] > rank[source]:
+                return False
+        return True
+
+    def _base_reaches(self, source: int, target: int) -> bool:
+        """Return True if component source reaches target in the graph as it was last built."""
+        if source == target:
+            return True
+        if source > target:
+            return False  # Edges only go from lower to higher component ids
+        if target >= self._component_count:
+            return False  # Added since the build, so only overlay edges reach it
+        if self._closure is not None:
+            return bool(self._closure[source] >> target & 1)
+        pre, last = self._pre, self._last
+        if pre[source] <= pre[target] <= last[source]:
+            return True
+        if not self._may_reach(source, target):
+            return False
+
+        # Pruned search over the condensation
+        indptr, indices = self._indptr, self._indices
+        seen = {source}
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            for child in indices[indptr[node]:indptr[node + 1]]:
+                if child == target or pre[child] <= pre[target] <= last[child]:
+                    return True
+                if child not in seen and child < target and self._may_reach(child, target):
+                    seen.add(child)
+                    stack.append(child)
+        return False
+
+    def reaches(self, from_node, to_node) -> bool:
+        """Return True if there is a path from from_node to to_node (every node reaches itself)."""
+        if self._stale:
+            self.rebuild()
+        component_of = self._component_of
+        if from_node not in component_of or to_node not in component_of:
+            return False
+        source = component_of[from_node]
+        target = component_of[to_node]
+        if self._base_reaches(source, target):
+            return True
+
+        # A path that uses added edges: grow the components reached through
+        # them, checking each overlay edge against each reached component once
+        reached = [source]
+        pending = self._overlay
+        for node in reached:  # reached grows while it is being read
+            remaining = []
+            for edge in pending:
+                if self._base_reaches(node, edge[0]):
+                    if self._base_reaches(edge[1], target):
+                        return True
+                    reached.append(edge[1])
+                else:
+                    remaining.append(edge)
+            pending = remaining
+            if not pending:
+                break
+        return False
+
+    def add_edge(self, from_node, to_node) -> bool:
+        """Add an edge to the graph, keeping the index valid; returns whether the edge was new."""
+        added = self.graph.add_edge(from_node, to_node)
+        if not added or self._stale:
+            return added
+        component_of = self._component_of
+        for node in (from_node, to_node):
+            if node not in component_of:
+                # New nodes get components of their own past the built ones
+                component_of[node] = self._next_component
+                self._next_component += 1
+        if not self.reaches(from_node, to_node):
+            # Every path the edge creates is otherwise already indexed
+            self._overlay.append((component_of[from_node], component_of[to_node]))
+            if len(self._overlay) > self.overlay_limit:
+                self._stale = True  # Rebuilt on the next query
+        return added
+
+
+def time_reachability_index(cluster_count: int = 200, cluster_size: int = 1000,
+                            query_count: int = 20000, dfs_query_count: int = 10,
+                            update_count: int = 200) -> None:
+    """Print build time, size and query latency of ReachabilityIndex vs one dfs per query, then interleaved add_edge costs."""
+    rng = random.Random(7)
+    node_count = cluster_count * cluster_size
+    edges = []
+    for cluster in range(cluster_count):
+        base = cluster * cluster_size
+        # Three random edges per node make most of a cluster one large SCC
+        for _ in range(3 * cluster_size):
+            edges.append((base + rng.randrange(cluster_size), base + rng.randrange(cluster_size)))
+        # A few edges into the next 20 clusters chain the SCCs into a DAG
+        for _ in range(5):
+            target = min(cluster_count - 1, cluster + rng.randint(1, 20))
+            if target != cluster:
+                edges.append((base + rng.randrange(cluster_size),
+                              target * cluster_size + rng.randrange(cluster_size)))
+
+    def make_graph() -> Graph:
+        g = Graph()
+        for node in range(node_count):
+            g.add_node(node)
+        g.add_edges(edges)
+        return g
+
+    g = make_graph()
+    start = time.perf_counter()
+    index = ReachabilityIndex(g)
+    build_time = time.perf_counter() - start
+    sizes = sorted(map(len, g.strongly_connected_components()), reverse=True)
+    print(f"  {node_count} nodes, {len(edges)} edges: built in {build_time:.2f}s, "
+          f"{index.nbytes() / 1e6:.1f} MB ({len(sizes)} components, largest {sizes[0]} nodes)")
+
+    queries = [(rng.randrange(node_count), rng.randrange(node_count))
+               for _ in range(query_count)]
+    positive = [query for query in queries if index.reaches(*query)]
+    negative = [query for query in queries if not index.reaches(*query)]
+    same = sum(index.component_of(a) == index.component_of(b) for a, b in queries)
+    print(f"  {len(positive)} of {query_count} queries reachable, {same} inside one component")
+    for name, group in (("reachable", positive), ("unreachable", negative)):
+        start = time.perf_counter()
+        for a, b in group:
+            index.reaches(a, b)
+        elapsed = time.perf_counter() - start
+        print(f"  reaches, {name}: {elapsed / max(len(group), 1) * 1e6:.1f} us/query")
+
+    start = time.perf_counter()
+    found = 0
+    for a, b in queries[:dfs_query_count]:
+        found += b in g.dfs(a)
+    elapsed = time.perf_counter() - start
+    print(f"  dfs + membership: {elapsed / dfs_query_count * 1e6:.0f} us/query ({found} of {dfs_query_count} reachable)")
+
+    # Interleave add_edge with queries; overlay_limit=0 rebuilds whenever an
+    # edge creates new paths, as a full-rebuild baseline
+    updates = [(rng.randrange(node_count), rng.randrange(node_count))
+               for _ in range(update_count)]
+    for name, overlay_limit, rounds in (("overlay", 64, update_count),
+                                        ("rebuild on change", 0, 3)):
+        index = ReachabilityIndex(make_graph(), overlay_limit=overlay_limit)
+        start = time.perf_counter()
+        for a, b in updates[:rounds]:
+            index.add_edge(a, b)
+            for query in queries[:10]:
+                index.reaches(*query)
+        elapsed = time.perf_counter() - start
+        rebuilds = index.rebuild_count - 1
+        print(f"  add_edge + 10 queries, {name}: {elapsed / rounds * 1e3:.1f} ms/round "
+              f"({rebuilds} rebuilds in {rounds} rounds)")
+
+
+def compare_dag_building(node_count: int = 1000, edge_count: int = 3000,
+                         growing_node_count: int = 20000) -> None:
+    """Print the time to build a DAG edge by edge with DAG vs has_cycle after every edge."""
+    rng = random.Random(3)
+    # Mostly "forward" edges, with some that may close a cycle
+    edges = []
+    for _ in range(edge_count):
+        a, b = rng.randrange(node_count), rng.randrange(node_count)
+        edges.append((min(a, b), max(a, b)) if rng.random() < 0.9 else (a, b))
+
+    start = time.perf_counter()
+    g = Graph()
+    rejected = 0
+    for from_node, to_node in edges:
+        if g.add_edge(from_node, to_node) and g.has_cycle():
+            g.remove_edge(from_node, to_node)
+            rejected += 1
+    print(f"  Graph + has_cycle: {len(edges)} edges in "
+          f"{time.perf_counter() - start:.2f}s ({rejected} rejected)")
+
+    def build(edges) -> tuple:
+        start = time.perf_counter()
+        dag = DAG()
+        rejected = 0
+        for from_node, to_node in edges:
+            try:
+                dag.add_edge(from_node, to_node)
+            except ValueError:
+                rejected += 1
+        return time.perf_counter() - start, rejected
+
+    elapsed, rejected = build(edges)
+    print(f"  DAG: {len(edges)} edges in {elapsed:.3f}s ({rejected} rejected)")
+
+    # A growing dependency graph: each new node depends on three existing
+    # ones, plus an occasional edge between two existing nodes
+    edges = []
+    for node in range(1, growing_node_count):
+        for _ in range(3):
+            edges.append((node, rng.randrange(node)))
+            if rng.random() < 0.1:
+                edges.append((rng.randrange(node), rng.randrange(node)))
+    elapsed, rejected = build(edges)
+    print(f"  DAG, growing graph: {len(edges)} edges in {elapsed:.2f}s "
+          f"({rejected} rejected)")
+
+
+def time_condense(node_count: int = 200000, edge_count: int = 1000000) -> None:
+    """Print the time of strongly_connected_components and condense on a random graph."""
+    rng = random.Random(4)
+    g = Graph()
+    for node in range(node_count):
+        g.add_node(node)
+    for _ in range(edge_count):
+        # Mostly forward edges, so there are many components of various sizes
+        a, b = rng.randrange(node_count), rng.randrange(node_count)
+        g.add_edge(*((min(a, b), max(a, b)) if rng.random() < 0.8 else (a, b)))
+
+    start = time.perf_counter()
+    components = g.strongly_connected_components()
+    scc_time = time.perf_counter() - start
+    start = time.perf_counter()
+    dag, _, _ = g.condense()
+    condense_time = time.perf_counter() - start
+    largest = max(map(len, components))
+    print(f"  {edge_count} edges: SCCs in {scc_time:.2f}s, condense in "
+          f"{condense_time:.2f}s ({len(components)} components, largest "
+          f"{largest}, {sum(map(len, dag.adj_list.values()))} DAG edges)")
+
+
+def compare_reachable_from_many(node_count: int = 20000, edge_count: int = 30000,
+                                source_count: int = 200, worker_counts: tuple = (1, 2, 4)) -> None:
+    """Print the time of one dfs per source vs reachable_from_many with several worker counts."""
+    rng = random.Random(5)
+    g = Graph()
+    for node in range(node_count):
+        g.add_node(node)
+    for _ in range(edge_count):
+        g.add_edge(rng.randrange(node_count), rng.randrange(node_count))
+    sources = [rng.randrange(node_count) for _ in range(source_count)]
+
+    start = time.perf_counter()
+    for source in sources:
+        g.dfs(source)
+    print(f"  dfs per source: {time.perf_counter() - start:.2f}s "
+          f"for {source_count} sources")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        g.reachable_from_many(sources, workers=workers)
+        print(f"  reachable_from_many, {workers} worker(s): "
+              f"{time.perf_counter() - start:.2f}s ({os.cpu_count()} CPUs)")
+
+
+def time_edge_file_load(edge_count: int = 500000, node_count: int = 100000) -> None:
+    """Print load speed and memory per edge of from_edge_file (plain and frozen) vs one add_edge call per line."""
+    rng = random.Random(6)
+    ids = array("I")
+    for _ in range(edge_count):
+        ids.append(rng.randrange(node_count))
+        ids.append(rng.randrange(node_count))
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {fmt: os.path.join(directory, f"edges.{fmt}") for fmt in ("csv", "tsv", "binary")}
+        for fmt in ("csv", "tsv"):
+            separator = "," if fmt == "csv" else "\t"
+            with open(paths[fmt], "w", encoding="utf-8") as file:
+                file.writelines(f"node{ids[i]}{separator}node{ids[i + 1]}\n"
+                                for i in range(0, len(ids), 2))
+        with open(paths["binary"], "wb") as file:
+            ids.tofile(file)
+
+        def add_edge_per_line() -> Graph:
+            g = Graph()
+            with open(paths["csv"], encoding="utf-8") as file:
+                for line in file:
+                    from_node, to_node = line.rstrip("\n").split(",")
+                    g.add_edge(from_node, to_node)
+            return g
+
+        loads = [("add_edge per csv line", "csv", add_edge_per_line)]
+        loads += [(f"from_edge_file {fmt}", fmt, lambda fmt=fmt: Graph.from_edge_file(paths[fmt], fmt))
+                  for fmt in ("csv", "tsv", "binary")]
+        loads += [(f"from_edge_file {fmt}, frozen", fmt,
+                   lambda fmt=fmt: Graph.from_edge_file(paths[fmt], fmt, frozen=True))
+                  for fmt in ("csv", "binary")]
+        for name, fmt, load in loads:
+            start = time.perf_counter()
+            g = load()
+            elapsed = time.perf_counter() - start
+            del g  # Not timed
+            tracemalloc.start()
+            g = load()
+            graph_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if isinstance(g, FrozenGraph):
+                edges = g.edge_count
+            else:
+                edges = sum(map(len, g.adj_list.values()))
+            del g
+            size = os.path.getsize(paths[fmt])
+            print(f"  {name}: {elapsed:.2f}s, {size / elapsed / 1e6:.1f} MB/s, "
+                  f"{edge_count / elapsed / 1e3:.0f}k edges/s, "
+                  f"{graph_bytes / edges:.0f} bytes/edge ({peak_bytes / edges:.0f} peak)")
+
+
+def compare_bfs(node_count: int = 100000, edge_count: int = 1000000,
+                start_count: int = 3) -> None:
+    """Print BFS throughput (edges per second) on a random low-diameter graph."""
+    rng = random.Random(1)
+    g = Graph()
+    for node in range(node_count):
+        g.add_node(node)
+    for _ in range(edge_count):
+        g.add_edge(rng.randrange(node_count), rng.randrange(node_count))
+    frozen = g.freeze()
+    frozen._reverse_csr()  # Built once per frozen graph, not per search
+    starts = [rng.randrange(node_count) for _ in range(start_count)]
+    edges = frozen.edge_count * start_count
+
+    runs = (
+        ("Graph.bfs (sorted)", lambda node: g.bfs(node)),
+        ("Graph.bfs_levels", lambda node: list(g.bfs_levels(node))),
+        ("FrozenGraph top-down", lambda node: list(frozen.bfs_levels(node, direction_optimizing=False))),
+        ("FrozenGraph direction-optimizing", lambda node: list(frozen.bfs_levels(node))),
+    )
+    for name, run in runs:
+        start = time.perf_counter()
+        for node in starts:
+            run(node)
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed:.2f}s, {edges / elapsed / 1e6:.2f}M edges/s")
+
+
+def time_node_removal(node_count: int = 200000, edge_count: int = 1000000,
+                      remove_count: int = 20000) -> None:
+    """Print the time to prune nodes one by one vs with remove_nodes."""
+    rng = random.Random(2)
+    edges = [(rng.randrange(node_count), rng.randrange(node_count))
+             for _ in range(edge_count)]
+    doomed = rng.sample(range(node_count), remove_count)
+    for name in ("remove_node", "remove_nodes"):
+        g = Graph()
+        for node in range(node_count):
+            g.add_node(node)
+        for from_node, to_node in edges:
+            g.add_edge(from_node, to_node)
+        start = time.perf_counter()
+        if name == "remove_node":
+            for node in doomed:
+                g.remove_node(node)
+        else:
+            g.remove_nodes(doomed)
+        print(f"  {name}: {remove_count} of {node_count} nodes in "
+              f"{time.perf_counter() - start:.3f}s")
+
+
+def time_long_chain(length: int = 1000000) -> None:
+    """Print traversal times on a chain far deeper than the recursion limit."""
+    g = Graph()
+    for node in range(length - 1):
+        g.add_edge(node, node + 1)
+
+    for name, run in (("dfs", lambda: g.dfs(0)),
+                      ("topological", lambda: g.topological(0)),
+                      ("topological_order", g.topological_order),
+                      ("find_cycle", g.find_cycle)):
+        start = time.perf_counter()
+        result = run()
+        print(f"  {name}: {time.perf_counter() - start:.2f}s ({len(result)} nodes)")
+
+    g.add_edge(length - 1, 0)
+    start = time.perf_counter()
+    cycle = g.find_cycle()
+    print(f"  find_cycle after closing the chain: "
+          f"{time.perf_counter() - start:.2f}s ({len(cycle) - 1} nodes)")
+
+
+def compare_frozen_graph(node_count: int = 50000, edge_count: int = 500000,
+                         layer_count: int = 20, start_count: int = 5) -> None:
+    """Print memory per edge and traversal times of Graph vs its frozen CSR copy."""
+    rng = random.Random(0)
+    # A layered DAG, so topological and has_cycle walk long acyclic paths
+    width = node_count // layer_count
+    tracemalloc.start()
+    g = Graph()
+    for node in range(node_count):
+        g.add_node(node)
+    for _ in range(edge_count):
+        source = rng.randrange(node_count - width)
+        target = (source // width + 1) * width + rng.randrange(width)
+        g.add_edge(source, min(target, node_count - 1))
+    graph_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    frozen = g.freeze()
+    freeze_time = time.perf_counter() - start
+    edges = frozen.edge_count
+    print(f"  dict of sets: {graph_bytes / edges:.1f} bytes/edge, "
+          f"CSR: {frozen.nbytes() / edges:.1f} bytes/edge "
+          f"(frozen in {freeze_time:.2f}s)")
+
+    starts = [rng.randrange(width) for _ in range(start_count)]
+    for name, graph in (("dict of sets", g), ("CSR", frozen)):
+        start = time.perf_counter()
+        for node in starts:
+            graph.topological(node)
+        topo_time = time.perf_counter() - start
+        start = time.perf_counter()
+        graph.has_cycle()
+        cycle_time = time.perf_counter() - start
+        print(f"  {name}: {start_count} topological sorts {topo_time:.2f}s, "
+              f"has_cycle {cycle_time:.4f}s")
+
+
+def run_benchmarks() -> None:
+    """Time each traversal, cycle check and reachability structure against its baseline."""
+    print("BFS throughput:")
+    compare_bfs()
+
+    print("\nDAG with incremental topological order:")
+    compare_dag_building()
+
+    print("\nStrongly connected components and condensation:")
+    time_condense()
+
+    print("\nReachability from many sources:")
+    compare_reachable_from_many()
+
+    print("\nBulk edge loading:")
+    time_edge_file_load()
+
+    print("\nReachability index:")
+    time_reachability_index()
+
+    print("\nPruning nodes:")
+    time_node_removal()
+
+    print("\nMillion-node chain:")
+    time_long_chain()
+
+    print("\nGraph vs frozen CSR graph:")
+    compare_frozen_graph()
+
+
 # Example usage:
 if __name__ == "__main__":
     g = Graph()
@@ -184,6 +1616,8 @@ if __name__ == "__main__":
     # Perform topological sort starting from A
     print("\nTopological sort starting from A:")
     print(g.topological("A"))
+    print("Topological order of the whole graph:")
+    print(g.topological_order())
 
     # Add an edge to create a cycle: C -> A
     g.add_edge("C", "A")
@@ -192,6 +1626,8 @@ if __name__ == "__main__":
 
     # Check for cycle again
     print("\nHas cycle:", g.has_cycle())
+    print("Cycle:", g.find_cycle())
+    print("Strongly connected components:", g.strongly_connected_components())
 
     # Remove edge
     g.remove_edge("A", "B")
@@ -202,3 +1638,37 @@ if __name__ == "__main__":
     g.remove_node("B")
     print("\nAfter removing node B:")
     print(g)
+    print("Predecessors of A:", g.predecessors("A"), "in-degree of D:", g.in_degree("D"))
+
+    # Frozen CSR copy
+    frozen = g.freeze()
+    print("\nFrozen graph DFS / BFS from A:")
+    print(frozen.dfs("A"), frozen.bfs("A"))
+    print("Frozen has cycle:", frozen.has_cycle())
+    print("\nBFS levels from A:", list(g.bfs_levels("A")))
+
+    print("\nDAG with incremental topological order:")
+    dag = DAG()
+    dag.add_edge("A", "B")
+    dag.add_edge("B", "C")
+    dag.add_edge("D", "A")
+    print("Order:", dag.topological_order())
+    try:
+        dag.add_edge("C", "D")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+    print("\nReachability from many sources:")
+    bits = g.reachable_from_many(["A", "C"], workers=1)
+    nodes = list(g.adj_list)
+    for source, mask in zip(["A", "C"], bits):
+        mask = int.from_bytes(mask, "little")
+        print(f"{source} reaches {[nodes[i] for i in range(len(nodes)) if mask >> i & 1]}")
+
+    print("\nReachability index:")
+    index = ReachabilityIndex(g)
+    print("A reaches D:", index.reaches("A", "D"), "D reaches A:", index.reaches("D", "A"))
+
+    if "--bench" in sys.argv[1:]:
+        print()
+        run_benchmarks()
@@ -1,12 +1,17 @@
+from collections import deque
+
+
 class Graph:
     def __init__(self):
         self.adj_list = {}
+        self.in_adj = {}  # node -> nodes with an edge into it
 
     def add_node(self, node: str) -> bool:
         """Add a node to the graph if it doesn't exist."""
         if node in self.adj_list:
             return False
         self.adj_list[node] = set()
+        self.in_adj[node] = set()
         return True
 
     def remove_node(self, node: str) -> bool:
@@ -14,14 +19,42 @@ class Graph:
         if node not in self.adj_list:
             return False
 
-        # Remove all edges pointing to this node
-        for other_node in self.adj_list:
-            self.adj_list[other_node].discard(node)
+        # Remove all edges pointing to this node, and their reverse entries
+        for predecessor in self.in_adj[node]:
+            self.adj_list[predecessor].discard(node)
+        for successor in self.adj_list[node]:
+            self.in_adj[successor].discard(node)
 
         # Remove the node itself
         del self.adj_list[node]
+        del self.in_adj[node]
         return True
 
+    def remove_nodes(self, nodes) -> int:
+        """Remove several nodes and their edges in one pass, returning how many were removed."""
+        doomed = {node for node in nodes if node in self.adj_list}
+        for node in doomed:
+            # Edges between two removed nodes disappear with the nodes
+            for predecessor in self.in_adj.pop(node):
+                if predecessor not in doomed:
+                    self.adj_list[predecessor].discard(node)
+            for successor in self.adj_list.pop(node):
+                if successor not in doomed:
+                    self.in_adj[successor].discard(node)
+        return len(doomed)
+
+    def predecessors(self, node: str) -> list:
+        """Return the nodes with an edge into node."""
+        if node not in self.in_adj:
+            return []
+        return list(self.in_adj[node])
+
+    def in_degree(self, node: str) -> int:
+        """Return the number of edges into node."""
+        if node not in self.in_adj:
+            return 0
+        return len(self.in_adj[node])
+
     def add_edge(self, from_node: str, to_node: str) -> bool:
         """Add an edge between two nodes."""
         # Check if both nodes exist, add them if they don't
@@ -33,6 +66,7 @@ class Graph:
         # Add the edge
         if to_node not in self.adj_list[from_node]:
             self.adj_list[from_node].add(to_node)
+            self.in_adj[to_node].add(from_node)
             return True
         return False
 
@@ -43,6 +77,7 @@ class Graph:
 
         if to_node in self.adj_list[from_node]:
             self.adj_list[from_node].discard(to_node)
+            self.in_adj[to_node].discard(from_node)
             return True
         return False
 
@@ -51,17 +86,20 @@ class Graph:
         if start_node not in self.adj_list:
             return []
 
-        visited = set()
-        traversal_order = []
-
-        def dfs_recursive(node: str):
-            visited.add(node)
-            traversal_order.append(node)
-            for neighbor in self.adj_list[node]:
+        visited = {start_node}
+        traversal_order = [start_node]
+        # Each entry is the iterator over a node's remaining neighbors, so a
+        # node resumes where it left off, exactly like a recursive call
+        stack = [iter(self.adj_list[start_node])]
+        while stack:
+            for neighbor in stack[-1]:
                 if neighbor not in visited:
-                    dfs_recursive(neighbor)
-
-        dfs_recursive(start_node)
+                    visited.add(neighbor)
+                    traversal_order.append(neighbor)
+                    stack.append(iter(self.adj_list[neighbor]))
+                    break
+            else:
+                stack.pop()
         return traversal_order
 
     def topological(self, start_node: str) -> list:
@@ -69,22 +107,44 @@ class Graph:
         if start_node not in self.adj_list:
             return []
 
-        visited = set()
+        visited = {start_node}
         stack = []
-
-        def topo_recursive(node: str):
-            visited.add(node)
+        pending = [(start_node, iter(self.adj_list[start_node]))]
+        while pending:
+            node, neighbors = pending[-1]
             # Visit all neighbors first
-            for neighbor in self.adj_list[node]:
+            for neighbor in neighbors:
                 if neighbor not in visited:
-                    topo_recursive(neighbor)
-            # Add node to stack after all neighbors are processed
-            stack.append(node)
-
-        topo_recursive(start_node)
+                    visited.add(neighbor)
+                    pending.append((neighbor, iter(self.adj_list[neighbor])))
+                    break
+            else:
+                # Add node to stack after all neighbors are processed
+                pending.pop()
+                stack.append(node)
         # Reverse the stack to get the topological order
         return stack[::-1]
 
+    def topological_order(self) -> list:
+        """Return a topological order of the whole graph (Kahn's algorithm)."""
+        in_degree = {node: len(sources) for node, sources in self.in_adj.items()}
+
+        # Repeatedly take a node that no remaining node points to
+        ready = deque(node for node, degree in in_degree.items() if not degree)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for neighbor in self.adj_list[node]:
+                in_degree[neighbor] -= 1
+                if not in_degree[neighbor]:
+                    ready.append(neighbor)
+
+        if len(order) != len(self.adj_list):
+            # Nodes on a cycle never reach in-degree 0
+            raise ValueError("Graph has a cycle")
+        return order
+
     def __str__(self) -> str:
         """Return a string representation of the graph."""
         result = []
@@ -117,3 +177,13 @@ if __name__ == "__main__":
     # Perform topological sort starting from X
     print("\nTopological sort starting from X:")
     print(g.topological("X"))
+
+    # Topological sort of the whole graph
+    print("\nTopological order of the whole graph:")
+    print(g.topological_order())
+
+    # Reverse-adjacency queries
+    print("\nPredecessors of P:", g.predecessors("P"), "in-degree:", g.in_degree("P"))
+    g.remove_nodes(["B", "A"])
+    print("After removing B and A:")
+    print(g)